@@ -1,18 +1,34 @@
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_app_context, Response
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt, decode_token
 from flask_cors import CORS
 import logging
 from datetime import datetime
 from marshmallow import Schema, fields, ValidationError
 from dotenv import load_dotenv
-from flask_socketio import SocketIO
-from models import db, User, Order, Service, OrderStatus, Cart  # Add Cart to imports
-import requests
+from flask_socketio import SocketIO, join_room, ConnectionRefusedError
+from sqlalchemy import event, func, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload
+from models import db, User, Order, Service, OrderStatus, Cart, CatalogVersion, upsert_insert  # Add Cart to imports
+from catalog_cache import catalog_cache
+from password_hasher import password_hasher, HasherSaturated
+from user_cache import user_existence_cache
+from mpesa import mpesa_client
+from jobs import JobQueue, QueueFull, JobAlreadyPending
+from mpesa_callbacks import CallbackProcessor, parse_stk_callback
+from event_emitter import CoalescingEmitter
+from sqlite_profile import configure_sqlite
+from cli import register_commands
+from catalog_import import import_jobs, import_catalog, detect_catalog_format, CATALOG_FORMATS
+from concurrent.futures import TimeoutError as HashTimeoutError
 import base64
+import json
+import math
 import socket
+import queue
 
 # Load environment variables
 load_dotenv()
@@ -30,7 +46,11 @@ logging.basicConfig(
 )
 
 def create_app():
-    """Flask Application Factory"""
+    """Flask Application Factory.
+
+    Has no database or file side effects; run `flask migrate` and `flask seed`
+    to create the schema and load the initial data.
+    """
     app = Flask(__name__)
 
     # Configurations from environment variables
@@ -38,6 +58,8 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///site.db')
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'fallback-jwt-secret')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['QUERY_COUNT_HEADER'] = os.getenv('QUERY_COUNT_HEADER', 'false').lower() == 'true'
+    configure_sqlite(app)  # WAL, busy_timeout and pool sizing when DB_PROFILE=production
 
     # Initialize Extensions
     db.init_app(app)
@@ -46,22 +68,34 @@ def create_app():
     CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
     socketio.init_app(app, cors_allowed_origins="*")
 
-    # Create database tables and seed initial data
-    with app.app_context():
-        db.create_all()
-        if not User.query.first():
-            admin = User(username="admin", password="admin123", role="admin")
-            db.session.add(admin)
-            db.session.commit()
-            logging.info("✅ Admin user seeded successfully")
-        # Seed services from populate_services
-        from populate_services import populate_services
-        populate_services(app)
+    @app.after_request
+    def add_query_count_header(response):
+        """Expose the number of SQL statements run for this request when enabled."""
+        if app.config['QUERY_COUNT_HEADER']:
+            response.headers['X-Query-Count'] = str(get_query_count())
+        return response
+
+    register_commands(app)
 
     return app
 
+# ----------------- QUERY COUNTER ----------------- #
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count SQL statements executed within the current app/request context."""
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+def get_query_count():
+    """Return the number of SQL statements executed in the current context."""
+    return g.get('query_count', 0) if has_app_context() else 0
+
 # Create App Instance
 app = create_app()
+password_hasher.sleep = socketio.sleep  # Wait for hashes without blocking the event loop
+events = CoalescingEmitter(socketio, window=float(os.getenv('EVENT_COALESCE_WINDOW', '0.2')))
+events.start()  # Flush loop runs on the Socket.IO event loop; worker threads only enqueue
 
 # ----------------- SCHEMAS FOR VALIDATION ----------------- #
 
@@ -79,6 +113,12 @@ class OrderSchema(Schema):
     quantity = fields.Int(load_default=1, validate=lambda x: x > 0)
     location = fields.Str(load_default="")
 
+class CartQuantitySchema(Schema):
+    quantity = fields.Int(required=True, validate=lambda x: x > 0)
+
+class CartSyncSchema(Schema):
+    items = fields.List(fields.Nested(OrderSchema), required=True)
+
 class UpdateOrderSchema(Schema):
     status = fields.Str(
         required=True,
@@ -98,6 +138,95 @@ def error_response(message, status_code):
     """Return a standardized error response."""
     return jsonify({"error": message}), status_code
 
+def get_current_claims():
+    """Return (user_id, role) from the verified JWT, or None if the user no longer exists.
+
+    The role comes from the token's claims; existence is checked through the
+    in-process user cache so most requests skip the User table entirely.
+    """
+    user_id = int(get_jwt_identity())
+    exists = user_existence_cache.exists(
+        user_id,
+        lambda: db.session.query(User.query_active().filter_by(id=user_id).exists()).scalar()
+    )
+    if not exists:
+        return None
+    return user_id, get_jwt().get("role", "user")
+
+ADMIN_ROOM = "admins"
+
+def user_room(user_id):
+    """Socket.IO room that every connection of a user joins."""
+    return f"user:{user_id}"
+
+def order_rooms(user_id):
+    """Rooms interested in a user's orders: the owner and all admins."""
+    return [user_room(user_id), ADMIN_ROOM]
+
+def hasher_busy_response():
+    """Return a fast 503 when the password hasher cannot take more work."""
+    response, status_code = error_response("Server busy, please retry shortly", 503)
+    response.headers['Retry-After'] = '1'
+    return response, status_code
+
+def encode_order_cursor(order):
+    """Encode an order's (created_at, id) position as an opaque cursor."""
+    position = json.dumps([order.created_at.isoformat(), order.id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_order_cursor(cursor):
+    """Decode a cursor into (created_at, id). Raises ValueError if malformed."""
+    try:
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def count_rows(query, column):
+    """COUNT a query's rows directly, without wrapping its columns, joins and ORDER BY in a subquery."""
+    return query.order_by(None).with_entities(func.count(column)).scalar()
+
+def paginate_orders(query):
+    """Paginate an order query in offset mode (page/per_page) or keyset mode (cursor).
+
+    Keyset mode is selected by passing a `cursor` argument (empty for the first
+    page). It walks the (created_at, id) index instead of counting and skipping
+    rows, and only reports `total` when `include_total=true` is requested.
+    """
+    per_page = request.args.get('per_page', 10, type=int)
+    if per_page < 1:
+        raise ValueError("per_page must be positive")
+    query = query.options(joinedload(Order.service))
+
+    if 'cursor' not in request.args:
+        page = request.args.get('page', 1, type=int)
+        orders_paginated = query.order_by(Order.created_at.desc()).paginate(
+            page=page, per_page=per_page, error_out=False, count=False
+        )
+        total = count_rows(query, Order.id)
+        return {
+            "orders": [order.serialize_with_service() for order in orders_paginated.items],
+            "total": total,
+            "pages": math.ceil(total / per_page)
+        }
+
+    result = {}
+    if request.args.get('include_total', 'false').lower() == 'true':
+        result["total"] = count_rows(query, Order.id)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        created_at, order_id = decode_order_cursor(cursor)
+        # A row-value comparison lets the planner seek into the (created_at, id) index
+        query = query.filter(tuple_(Order.created_at, Order.id) < tuple_(created_at, order_id))
+
+    orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(per_page + 1).all()
+    has_more = len(orders) > per_page
+    orders = orders[:per_page]
+    result["orders"] = [order.serialize_with_service() for order in orders]
+    result["next_cursor"] = encode_order_cursor(orders[-1]) if has_more else None
+    return result
+
 # ----------------- AUTHENTICATION ROUTES ----------------- #
 
 @app.route('/api/register', methods=['POST'])
@@ -110,7 +239,7 @@ def register():
 
         new_user = User(
             username=data['username'],
-            password=data['password'],
+            password_hash=password_hasher.hash(data['password']),
             role=data['role']
         )
         db.session.add(new_user)
@@ -120,6 +249,8 @@ def register():
     except ValidationError as err:
         logging.warning(f"Validation error during registration: {err.messages}")
         return error_response(err.messages, 422)
+    except (HasherSaturated, HashTimeoutError):
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error during registration: {str(e)}")
@@ -131,7 +262,7 @@ def login():
     try:
         data = LoginSchema().load(request.get_json())
         user = User.query_active().filter_by(username=data['username']).first()
-        if not user or not user.verify_password(data['password']):
+        if not user or not password_hasher.check(user.password_hash, data['password']):
             return error_response("Invalid credentials", 401)
 
         access_token = create_access_token(identity=str(user.id), additional_claims={"role": user.role})
@@ -143,6 +274,8 @@ def login():
     except ValidationError as err:
         logging.warning(f"Validation error during login: {err.messages}")
         return error_response(err.messages, 422)
+    except (HasherSaturated, HashTimeoutError):
+        return hasher_busy_response()
     except Exception as e:
         logging.error(f"Error during login: {str(e)}")
         return error_response("Internal server error", 500)
@@ -169,19 +302,25 @@ def forgot_password():
         return error_response("Internal server error", 500)
 
 @app.route('/api/reset-password', methods=['POST'])
+@jwt_required()
 def reset_password():
     """Handles password reset request."""
     try:
         data = ResetPasswordSchema().load(request.get_json())
         user_id = get_jwt_identity()
-        user = User.query_active().get_or_404(int(user_id))
-        user.password = data['new_password']
+        user = User.query_active().filter_by(id=int(user_id)).first()
+        if not user:
+            return error_response("User not found", 404)
+        user.password_hash = password_hasher.hash(data['new_password'])
         db.session.commit()
         logging.info(f"Password reset for user {user.username}")
         return jsonify({"message": "Password reset successfully"}), 200
     except ValidationError as err:
         logging.warning(f"Validation error during reset password: {err.messages}")
         return error_response(err.messages, 422)
+    except (HasherSaturated, HashTimeoutError):
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error during reset password: {str(e)}")
@@ -192,7 +331,11 @@ def reset_password():
 @app.route('/api/cart', methods=['POST'])
 @jwt_required()
 def add_to_cart():
-    """Add an item to the user's cart."""
+    """Add an item to the user's cart.
+
+    Adding a service that is already in the cart for the same location
+    increases that line's quantity instead of creating a new line.
+    """
     try:
         user_id = get_jwt_identity()
         data = OrderSchema().load(request.get_json())
@@ -202,21 +345,47 @@ def add_to_cart():
         if not service:
             return error_response("Service not found", 404)
 
-        # Add item to cart
-        cart_item = Cart(
+        # Insert the line, or add to its quantity if it is already in the cart
+        stmt = upsert_insert(Cart).values(
             user_id=int(user_id),
             service_id=data['service_id'],
             quantity=data['quantity'],
-            location=data['location']
+            location=data['location'],
+            created_at=datetime.utcnow()
         )
-        db.session.add(cart_item)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "service_id", "location"],
+            index_where=Cart.deleted_at.is_(None),
+            set_={"quantity": Cart.quantity + stmt.excluded.quantity}
+        ).returning(Cart.id, Cart.quantity)
+        cart_item_id, quantity = db.session.execute(stmt).one()
         db.session.commit()
 
+        cart_item = {
+            "id": cart_item_id,
+            "user_id": int(user_id),
+            "service_id": service.id,
+            "service_name": service.name,
+            "price": service.price,
+            "currency": service.currency,
+            "quantity": quantity,
+            "location": data['location'],
+            "total_price": service.price * quantity
+        }
+
         # Emit WebSocket event for real-time updates
-        socketio.emit("cart_updated", {"message": "Item added to cart", "cart_item": cart_item.serialize_with_service()})
+        events.emit("cart_updated", f"cart:{cart_item_id}", {
+            "id": cart_item_id,
+            "service_id": service.id,
+            "service_name": service.name,
+            "price": service.price,
+            "quantity": quantity,
+            "location": data['location'],
+            "op": "upsert"
+        }, to=user_room(user_id))
 
         logging.info(f"Item added to cart for user {user_id}")
-        return jsonify({"message": "Item added to cart", "cart_item": cart_item.serialize_with_service()}), 201
+        return jsonify({"message": "Item added to cart", "cart_item": cart_item}), 201
     except ValidationError as err:
         logging.warning(f"Validation error in add_to_cart: {err.messages}")
         return error_response(err.messages, 422)
@@ -228,19 +397,168 @@ def add_to_cart():
 @app.route('/api/cart', methods=['GET'])
 @jwt_required()
 def get_cart():
-    """Get all items in the user's cart."""
+    """Get all items in the user's cart with line totals, grand total and item count.
+
+    Cart is joined to Service in one query; the totals come from window
+    aggregates over the same rows, so nothing is summed in Python.
+    """
     try:
-        user_id = get_jwt_identity()
-        user = User.query_active().filter_by(id=int(user_id)).first()
-        if not user:
+        claims = get_current_claims()
+        if not claims:
             return error_response("User not found", 404)
+        user_id, _ = claims
+
+        line_total = Service.price * Cart.quantity
+        # Framing the window in the result order lets SQLite reuse the index order instead of re-sorting
+        whole_cart = {"order_by": (Cart.created_at, Cart.id), "rows": (None, None)}
+        rows = (
+            db.session.query(
+                Cart.id, Cart.service_id, Service.name, Service.price, Service.currency,
+                Cart.quantity, Cart.location, Cart.created_at,
+                line_total.label("line_total"),
+                func.sum(line_total).over(**whole_cart).label("total_amount"),
+                func.sum(Cart.quantity).over(**whole_cart).label("item_count")
+            )
+            .join(Service, Service.id == Cart.service_id)
+            .filter(Cart.user_id == user_id, Cart.deleted_at.is_(None))
+            .order_by(Cart.created_at, Cart.id)
+            .all()
+        )
 
-        cart_items = user.serialize_cart()
-        return jsonify({"cart": cart_items}), 200
+        cart_items = [{
+            "id": row.id,
+            "user_id": user_id,
+            "service_id": row.service_id,
+            "service_name": row.name,
+            "price": row.price,
+            "currency": row.currency,
+            "quantity": row.quantity,
+            "location": row.location,
+            "total_price": row.line_total,
+            "created_at": row.created_at.isoformat()
+        } for row in rows]
+        return jsonify({
+            "cart": cart_items,
+            "lines": len(rows),
+            "item_count": int(rows[0].item_count) if rows else 0,
+            "total_amount": float(rows[0].total_amount) if rows else 0.0
+        }), 200
     except Exception as e:
         logging.error(f"Error fetching cart: {str(e)}")
         return error_response("Internal server error", 500)
 
+@app.route('/api/cart/summary', methods=['GET'])
+@jwt_required()
+def get_cart_summary():
+    """Return only the line count, item count and total of the user's cart, from one aggregate query."""
+    try:
+        user_id = int(get_jwt_identity())
+        lines, item_count, total_amount = (
+            db.session.query(
+                func.count(Cart.id),
+                func.coalesce(func.sum(Cart.quantity), 0),
+                func.coalesce(func.sum(Service.price * Cart.quantity), 0)
+            )
+            .join(Service, Service.id == Cart.service_id)
+            .filter(Cart.user_id == user_id, Cart.deleted_at.is_(None))
+            .one()
+        )
+        return jsonify({"lines": lines, "item_count": int(item_count), "total_amount": float(total_amount)}), 200
+    except Exception as e:
+        logging.error(f"Error fetching cart summary: {str(e)}")
+        return error_response("Internal server error", 500)
+
+@app.route('/api/cart', methods=['PUT'])
+@jwt_required()
+def replace_cart():
+    """Replace the user's whole cart in a single transaction.
+
+    Lines for the same service and location are merged by adding their
+    quantities. One `cart_updated` event with op "replaced" is sent afterwards.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        data = CartSyncSchema().load(request.get_json())
+
+        quantities = {}
+        for item in data['items']:
+            key = (item['service_id'], item['location'])
+            quantities[key] = quantities.get(key, 0) + item['quantity']
+
+        service_ids = {service_id for service_id, _ in quantities}
+        prices = dict(
+            db.session.query(Service.id, Service.price)
+            .filter(Service.id.in_(service_ids), Service.deleted_at.is_(None), Service.is_active.is_(True))
+            .all()
+        ) if service_ids else {}
+        missing = service_ids - prices.keys()
+        if missing:
+            return error_response(f"Service {min(missing)} not found", 404)
+
+        now = datetime.utcnow()
+        Cart.query_active().filter_by(user_id=user_id).delete(synchronize_session=False)
+        if quantities:
+            db.session.execute(
+                db.insert(Cart),
+                [
+                    {"user_id": user_id, "service_id": service_id, "quantity": quantity, "location": location, "created_at": now}
+                    for (service_id, location), quantity in quantities.items()
+                ]
+            )
+        db.session.commit()
+
+        item_count = sum(quantities.values())
+        total_amount = sum(prices[service_id] * quantity for (service_id, _), quantity in quantities.items())
+        events.emit("cart_updated", "cart", {"op": "replaced", "lines": len(quantities), "item_count": item_count}, to=user_room(user_id))
+
+        logging.info(f"Cart replaced for user {user_id} with {len(quantities)} lines")
+        return jsonify({
+            "message": "Cart updated",
+            "lines": len(quantities),
+            "item_count": item_count,
+            "total_amount": float(total_amount)
+        }), 200
+    except ValidationError as err:
+        logging.warning(f"Validation error in replace_cart: {err.messages}")
+        return error_response(err.messages, 422)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error replacing cart: {str(e)}")
+        return error_response("Internal server error", 500)
+
+@app.route('/api/cart/<int:cart_item_id>', methods=['PATCH'])
+@jwt_required()
+def update_cart_quantity(cart_item_id):
+    """Set the quantity of a cart line in place."""
+    try:
+        user_id = get_jwt_identity()
+        data = CartQuantitySchema().load(request.get_json())
+
+        updated = (
+            Cart.query_active()
+            .filter_by(id=cart_item_id, user_id=int(user_id))
+            .update({"quantity": data['quantity']}, synchronize_session=False)
+        )
+        if not updated:
+            return error_response("Cart item not found", 404)
+        db.session.commit()
+
+        events.emit("cart_updated", f"cart:{cart_item_id}", {
+            "id": cart_item_id,
+            "quantity": data['quantity'],
+            "op": "upsert"
+        }, to=user_room(user_id))
+
+        logging.info(f"Cart item {cart_item_id} quantity set to {data['quantity']} for user {user_id}")
+        return jsonify({"message": "Cart item updated", "id": cart_item_id, "quantity": data['quantity']}), 200
+    except ValidationError as err:
+        logging.warning(f"Validation error in update_cart_quantity: {err.messages}")
+        return error_response(err.messages, 422)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error updating cart item: {str(e)}")
+        return error_response("Internal server error", 500)
+
 @app.route('/api/cart/<int:cart_item_id>', methods=['DELETE'])
 @jwt_required()
 def remove_from_cart(cart_item_id):
@@ -255,7 +573,7 @@ def remove_from_cart(cart_item_id):
         db.session.commit()
 
         # Emit WebSocket event for real-time updates
-        socketio.emit("cart_updated", {"message": "Item removed from cart", "cart_item_id": cart_item_id})
+        events.emit("cart_updated", f"cart:{cart_item_id}", {"id": cart_item_id, "op": "removed"}, to=user_room(user_id))
 
         logging.info(f"Item removed from cart for user {user_id}")
         return jsonify({"message": "Item removed from cart"}), 200
@@ -266,127 +584,271 @@ def remove_from_cart(cart_item_id):
 
 # ----------------- M-PESA PAYMENT ROUTES ----------------- #
 
-def get_mpesa_access_token():
-    """Get M-Pesa API access token."""
-    consumer_key = os.getenv("MPESA_CONSUMER_KEY")
-    consumer_secret = os.getenv("MPESA_CONSUMER_SECRET")
-    
-    if not consumer_key or not consumer_secret:
-        logging.error("M-Pesa consumer key or secret is missing.")
-        raise Exception("M-Pesa consumer key or secret is missing.")
-    
-    credentials = f"{consumer_key}:{consumer_secret}"
-    encoded_credentials = base64.b64encode(credentials.encode()).decode()
-
-    headers = {
-        "Authorization": f"Basic {encoded_credentials}"
+class CheckoutError(Exception):
+    """A cart that cannot be checked out, with the HTTP status to report."""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def build_checkout(user_id):
+    """Price every line in the user's cart with a single service lookup.
+
+    Returns (lines, total_amount) where each line is a dict of order columns
+    plus the `cart_item_id` it was priced from.
+    """
+    cart_items = Cart.query_active().filter_by(user_id=user_id).all()
+    if not cart_items:
+        raise CheckoutError("Cart is empty", 400)
+
+    service_ids = {item.service_id for item in cart_items}
+    prices = dict(
+        db.session.query(Service.id, Service.price)
+        .filter(Service.id.in_(service_ids), Service.deleted_at.is_(None), Service.is_active.is_(True))
+        .all()
+    )
+
+    lines = []
+    total_amount = 0
+    for item in cart_items:
+        if item.service_id not in prices:
+            raise CheckoutError(f"Service {item.service_id} not found", 404)
+        line_total = prices[item.service_id] * item.quantity
+        total_amount += line_total
+        lines.append({
+            "cart_item_id": item.id,
+            "user_id": user_id,
+            "service_id": item.service_id,
+            "quantity": item.quantity,
+            "location": item.location,
+            "total_price": float(line_total),
+        })
+    return lines, total_amount
+
+def place_orders(user_id, lines, checkout_request_id, status=OrderStatus.PROCESSING):
+    """Bulk-insert the priced cart lines as orders and remove those cart lines in one transaction.
+
+    Only the lines that were priced are removed; anything added to the cart
+    since build_checkout stays there.
+    """
+    now = datetime.utcnow()
+    cart_item_ids = [line["cart_item_id"] for line in lines]
+    db.session.execute(
+        db.insert(Order),
+        [
+            dict({k: v for k, v in line.items() if k != "cart_item_id"},
+                 status=status, checkout_request_id=checkout_request_id, created_at=now)
+            for line in lines
+        ]
+    )
+    Cart.query_active().filter(Cart.user_id == user_id, Cart.id.in_(cart_item_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+def initiate_stk_push(user_id, phone_number, lines, total_amount):
+    """Send the STK push for a priced cart and record the resulting orders."""
+    shortcode = os.getenv("MPESA_SHORTCODE")
+    passkey = os.getenv("MPESA_PASSKEY")
+    callback_url = os.getenv("MPESA_CALLBACK_URL", "http://192.168.213.152:5000/api/mpesa/callback")
+
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    password = base64.b64encode(f"{shortcode}{passkey}{timestamp}".encode()).decode()
+
+    payload = {
+        "BusinessShortCode": shortcode,
+        "Password": password,
+        "Timestamp": timestamp,
+        "TransactionType": "CustomerPayBillOnline",
+        "Amount": total_amount,
+        "PartyA": phone_number,
+        "PartyB": shortcode,
+        "PhoneNumber": phone_number,
+        "CallBackURL": callback_url,
+        "AccountReference": f"Cart Payment for User {user_id}",
+        "TransactionDesc": "Payment for cart items",
     }
-    
-    try:
-        response = requests.get(
-            "https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials",
-            headers=headers
-        )
-        response.raise_for_status()
-        access_token = response.json().get("access_token")
-        if not access_token:
-            logging.error("Access token not found in the response.")
-            raise Exception("Access token not found in the response.")
-        return access_token
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to get M-Pesa access token: {str(e)}")
-        raise Exception("Failed to get M-Pesa access token")
+
+    logging.debug(f"M-Pesa STK Push payload: {payload}")
+    response_data = mpesa_client.stk_push(payload)
+
+    # Save orders and clear the cart after successful payment initiation
+    checkout_request_id = response_data.get("CheckoutRequestID")
+    place_orders(user_id, lines, checkout_request_id)
+    events.emit("order_updated", f"checkout:{checkout_request_id}", {
+        "checkout_request_id": checkout_request_id,
+        "user_id": user_id,
+        "status": OrderStatus.PROCESSING.value
+    }, to=order_rooms(user_id))
+    return response_data
+
+def process_payment_job(job_id, user_id, phone_number, lines, total_amount):
+    """Background worker body for asynchronous checkout; pushes the outcome over Socket.IO."""
+    with app.app_context():
+        try:
+            response_data = initiate_stk_push(user_id, phone_number, lines, total_amount)
+        except Exception as e:
+            db.session.rollback()
+            socketio.emit("payment_result", {"job_id": job_id, "user_id": user_id, "status": "failed", "error": str(e)}, to=user_room(user_id))
+            raise
+        finally:
+            db.session.remove()
+    socketio.emit("payment_result", {"job_id": job_id, "user_id": user_id, "status": "completed", "result": response_data}, to=user_room(user_id))
+    return response_data
+
+payment_jobs = JobQueue(
+    workers=int(os.getenv('PAYMENT_WORKERS', '4')),
+    max_pending=int(os.getenv('PAYMENT_MAX_PENDING', '100')),
+    name="payment"
+)
 
 @app.route('/api/mpesa/payment', methods=['POST'])
 @jwt_required()
 def mpesa_payment():
-    """Handle M-Pesa payment for all items in the cart."""
+    """Handle M-Pesa payment for all items in the cart.
+
+    With `?async=true` the cart is validated, the STK push is queued on the
+    payment worker pool and a 202 with a job id is returned immediately; the
+    outcome is pushed to the client as a `payment_result` Socket.IO event.
+    While a user's payment job is unfinished, further checkouts get a 409 with
+    that job's id instead of a second STK push.
+    """
     try:
-        user_id = get_jwt_identity()
+        user_id = int(get_jwt_identity())
         data = request.get_json()
         phone_number = data.get("phone_number")
 
         if not phone_number:
             return error_response("Phone number is required", 400)
 
-        # Fetch all items in the user's cart
-        cart_items = Cart.query_active().filter_by(user_id=int(user_id)).all()
-        if not cart_items:
-            return error_response("Cart is empty", 400)
-
-        # Calculate total amount
-        total_amount = 0
-        for item in cart_items:
-            service = Service.query_active().filter_by(id=item.service_id).first()
-            if not service:
-                return error_response(f"Service {item.service_id} not found", 404)
-            total_amount += service.price * item.quantity
-
-        # Initiate M-Pesa payment
-        access_token = get_mpesa_access_token()
-        shortcode = os.getenv("MPESA_SHORTCODE")
-        passkey = os.getenv("MPESA_PASSKEY")
-        callback_url = os.getenv("MPESA_CALLBACK_URL", "http://192.168.213.152:5000/api/mpesa/callback")
-
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        password = base64.b64encode(f"{shortcode}{passkey}{timestamp}".encode()).decode()
-
-        payload = {
-            "BusinessShortCode": shortcode,
-            "Password": password,
-            "Timestamp": timestamp,
-            "TransactionType": "CustomerPayBillOnline",
-            "Amount": total_amount,
-            "PartyA": phone_number,
-            "PartyB": shortcode,
-            "PhoneNumber": phone_number,
-            "CallBackURL": callback_url,
-            "AccountReference": f"Cart Payment for User {user_id}",
-            "TransactionDesc": "Payment for cart items",
-        }
+        pending_job = payment_jobs.active_job(user_id)
+        if pending_job:
+            raise JobAlreadyPending(pending_job)
 
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json",
-        }
+        lines, total_amount = build_checkout(user_id)
 
-        logging.debug(f"M-Pesa STK Push payload: {payload}")
-        response = requests.post(
-            "https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest",
-            json=payload,
-            headers=headers
-        )
-        if response.status_code != 200:
-            raise Exception(f"Failed to initiate STK Push: {response.text}")
-
-        response_data = response.json()
-
-        # Save orders to the database after successful payment initiation
-        for item in cart_items:
-            order = Order(
-                user_id=int(user_id),
-                service_id=item.service_id,
-                quantity=item.quantity,
-                location=item.location,
-                total_price=Service.query_active().filter_by(id=item.service_id).first().price * item.quantity,
-                status=OrderStatus.PROCESSING,
-                checkout_request_id=response_data.get("CheckoutRequestID")
-            )
-            db.session.add(order)
-
-        # Clear the cart
-        Cart.query_active().filter_by(user_id=int(user_id)).delete()
-        db.session.commit()
+        if request.args.get('async', 'false').lower() == 'true':
+            job_id = payment_jobs.submit(user_id, process_payment_job, user_id, phone_number, lines, total_amount, exclusive=True)
+            logging.info(f"Queued payment job {job_id} for user {user_id}")
+            return jsonify({"job_id": job_id, "status": "pending"}), 202
 
-        socketio.emit("order_updated", {"message": "Payment initiated for cart items"})
+        response_data = initiate_stk_push(user_id, phone_number, lines, total_amount)
         return jsonify(response_data), 200
+    except CheckoutError as e:
+        return error_response(str(e), e.status_code)
+    except JobAlreadyPending as e:
+        logging.info(f"Checkout for user {user_id} rejected: payment job {e.job_id} is still pending")
+        return jsonify({"error": "A payment for this cart is already in progress", "job_id": e.job_id}), 409
+    except QueueFull:
+        response, status_code = error_response("Payment service busy, please retry shortly", 503)
+        response.headers['Retry-After'] = '2'
+        return response, status_code
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error in mpesa_payment: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/mpesa/payment/<job_id>', methods=['GET'])
+@jwt_required()
+def get_payment_job(job_id):
+    """Return the status of an asynchronous payment job owned by the user."""
+    job = payment_jobs.status(job_id)
+    if not job or job["owner_id"] != int(get_jwt_identity()):
+        return error_response("Payment job not found", 404)
+    return jsonify(job), 200
+
+def apply_mpesa_callbacks(results):
+    """Apply a batch of STK results with one UPDATE per outcome and one event per checkout.
+
+    Only orders still in PROCESSING are touched, so replayed callbacks are no-ops.
+    Returns the checkout ids that matched no pending order.
+    """
+    with app.app_context():
+        try:
+            pending = db.session.query(Order.checkout_request_id, Order.user_id).filter(
+                Order.checkout_request_id.in_(list(results)),
+                Order.status == OrderStatus.PROCESSING,
+                Order.deleted_at.is_(None)
+            ).distinct().all()
+            if not pending:
+                return list(results)
+
+            paid = [cid for cid, _ in pending if results[cid] == 0]
+            failed = [cid for cid, _ in pending if results[cid] != 0]
+            for status, checkout_ids in ((OrderStatus.PAID, paid), (OrderStatus.FAILED, failed)):
+                if checkout_ids:
+                    db.session.query(Order).filter(
+                        Order.checkout_request_id.in_(checkout_ids),
+                        Order.status == OrderStatus.PROCESSING
+                    ).update({Order.status: status}, synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+    for checkout_request_id, user_id in pending:
+        status = OrderStatus.PAID if results[checkout_request_id] == 0 else OrderStatus.FAILED
+        events.emit("order_updated", f"checkout:{checkout_request_id}", {
+            "checkout_request_id": checkout_request_id,
+            "user_id": user_id,
+            "status": status.value
+        }, to=order_rooms(user_id))
+    logging.info(f"Applied {len(pending)} M-Pesa callbacks ({len(paid)} paid, {len(failed)} failed)")
+    matched = {checkout_request_id for checkout_request_id, _ in pending}
+    return [checkout_request_id for checkout_request_id in results if checkout_request_id not in matched]
+
+mpesa_callbacks = CallbackProcessor(apply_mpesa_callbacks)
+
+@app.route('/api/mpesa/callback', methods=['POST'])
+def mpesa_callback():
+    """Acknowledge an M-Pesa STK callback immediately and queue it for processing."""
+    try:
+        checkout_request_id, result_code, result_desc = parse_stk_callback(request.get_json(silent=True))
+    except (ValueError, TypeError, AttributeError) as e:
+        logging.warning(f"Invalid M-Pesa callback: {str(e)}")
+        return jsonify({"ResultCode": 1, "ResultDesc": "Rejected"}), 400
+
+    try:
+        if mpesa_callbacks.enqueue(checkout_request_id, result_code):
+            logging.info(f"M-Pesa callback queued for {checkout_request_id}: {result_code} {result_desc}")
+        else:
+            logging.info(f"Duplicate M-Pesa callback ignored for {checkout_request_id}")
+    except queue.Full:
+        logging.error(f"❌ M-Pesa callback queue full; dropped {checkout_request_id}: {result_code} {result_desc}")
+    return jsonify({"ResultCode": 0, "ResultDesc": "Accepted"}), 200
+
 # ----------------- SERVICE ROUTES ----------------- #
 
+def current_catalog_snapshot():
+    """Return the (body, version) of the whole-catalog snapshot, rebuilding it if the catalog changed."""
+    catalog_cache.ensure_current(CatalogVersion.current)
+    snapshot = catalog_cache.snapshot()
+    if snapshot is None:
+        from populate_services import build_catalog_snapshot
+        build_catalog_snapshot()
+        snapshot = catalog_cache.snapshot()
+    return snapshot
+
+@app.route('/api/services', methods=['GET'])
+def get_all_services():
+    """Returns every active service grouped by category, stamped with a catalog version.
+
+    The response is built once per catalog version and served from memory;
+    it is public catalog data, so no JWT is required.
+    """
+    try:
+        body, version = current_catalog_snapshot()
+
+        if request.if_none_match.contains(version):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=200, mimetype="application/json")
+        response.set_etag(version)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        logging.error(f"Error fetching service catalog: {str(e)}")
+        return error_response("Internal server error", 500)
+
 @app.route('/api/services/<category>', methods=['GET'])
 @jwt_required()
 def get_services_by_category(category):
@@ -401,18 +863,39 @@ def get_services_by_category(category):
 
         logging.info(f"User {identity} fetching services - category: {category}, page: {page}, per_page: {per_page}")
 
-        services_paginated = Service.query_active().filter_by(category=category).order_by(Service.name.asc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        if not services_paginated.items:
-            return jsonify({"services": []}), 200
-
-        services_list = [{"id": s.id, "name": s.name, "price": float(s.price)} for s in services_paginated.items]
-        return jsonify({
-            "services": services_list,
-            "total": services_paginated.total,
-            "pages": services_paginated.pages
-        }), 200
+        current_catalog_snapshot()
+        cache_key = (category, page, per_page)
+        cached = catalog_cache.get(cache_key)
+        if cached:
+            body, etag = cached
+        elif category not in catalog_cache.categories():
+            # Unknown categories are answered without a query and never cached
+            body = json.dumps({"services": []}).encode("utf-8")
+            etag = f"{catalog_cache.version}-empty"
+        else:
+            services_query = Service.query_active().filter_by(category=category)
+            services_paginated = services_query.order_by(Service.name.asc()).paginate(
+                page=page, per_page=per_page, error_out=False, count=False
+            )
+            if not services_paginated.items:
+                payload = {"services": []}
+            else:
+                total = count_rows(services_query, Service.id)
+                payload = {
+                    "services": [{"id": s.id, "name": s.name, "price": float(s.price)} for s in services_paginated.items],
+                    "total": total,
+                    "pages": math.ceil(total / per_page)
+                }
+            body = json.dumps(payload).encode("utf-8")
+            etag = catalog_cache.set(cache_key, body)
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=200, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except ValueError as ve:
         logging.error(f"ValueError in get_services_by_category: {str(ve)}")
         return error_response("Invalid request parameters", 400)
@@ -420,6 +903,63 @@ def get_services_by_category(category):
         logging.error(f"Error fetching services: {str(e)}")
         return error_response("Internal server error", 500)
 
+def process_import_job(job_id, data, fmt):
+    """Background worker body for a catalog import; progress is written to the job record."""
+    with app.app_context():
+        try:
+            return import_catalog(data, fmt, progress=lambda **fields: import_jobs.update(job_id, **fields))
+        finally:
+            db.session.remove()
+
+@app.route('/api/admin/services/import', methods=['POST'])
+@jwt_required()
+def import_services():
+    """Admin uploads a CSV or JSON catalog; it is validated and upserted in the background.
+
+    The file may be sent as multipart field `file` or as the raw request body;
+    the format comes from `?format=`, the filename or the content type. Returns
+    202 with a job id to poll for progress and per-row errors.
+    """
+    try:
+        claims = get_current_claims()
+        if not claims:
+            return error_response("User not found", 404)
+        user_id, role = claims
+        if role != 'admin':
+            return error_response("Unauthorized - Admin access required", 403)
+
+        upload = request.files.get('file')
+        if upload:
+            data = upload.read()
+            fmt = request.args.get('format') or detect_catalog_format(upload.filename, upload.mimetype)
+        else:
+            data = request.get_data()
+            fmt = request.args.get('format') or detect_catalog_format(content_type=request.content_type)
+        if not data:
+            return error_response("No catalog file uploaded", 400)
+        if fmt not in CATALOG_FORMATS:
+            return error_response("Catalog format must be csv or json", 400)
+
+        job_id = import_jobs.submit(user_id, process_import_job, data, fmt)
+        logging.info(f"Queued catalog import job {job_id} ({fmt}, {len(data)} bytes) for admin {user_id}")
+        return jsonify({"job_id": job_id, "status": "pending"}), 202
+    except QueueFull:
+        response, status_code = error_response("Import queue is full, please retry shortly", 503)
+        response.headers['Retry-After'] = '5'
+        return response, status_code
+    except Exception as e:
+        logging.error(f"Error queuing catalog import: {str(e)}")
+        return error_response("Internal server error", 500)
+
+@app.route('/api/admin/services/import/<job_id>', methods=['GET'])
+@jwt_required()
+def get_import_job(job_id):
+    """Return progress, per-row errors and the outcome of a catalog import job."""
+    job = import_jobs.status(job_id)
+    if not job or job["owner_id"] != int(get_jwt_identity()):
+        return error_response("Import job not found", 404)
+    return jsonify(job), 200
+
 # ----------------- ORDER ROUTES ----------------- #
 
 @app.route('/api/orders/my', methods=['GET'])
@@ -428,19 +968,9 @@ def get_user_orders():
     """Fetches orders for the logged-in user with pagination."""
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        logging.info(f"User {user_id} fetching their orders, args: {request.args.to_dict()}")
 
-        logging.info(f"User {user_id} fetching their orders, page: {page}, per_page: {per_page}")
-
-        orders_paginated = Order.query_active().filter_by(user_id=int(user_id)).order_by(Order.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        return jsonify({
-            "orders": [order.serialize_with_service() for order in orders_paginated.items],
-            "total": orders_paginated.total,
-            "pages": orders_paginated.pages
-        }), 200
+        return jsonify(paginate_orders(Order.query_active().filter_by(user_id=int(user_id)))), 200
     except ValueError as ve:
         logging.error(f"ValueError in get_user_orders: {str(ve)}")
         return error_response("Invalid request parameters", 400)
@@ -453,30 +983,19 @@ def get_user_orders():
 def get_orders():
     """Fetches orders based on user role with pagination."""
     try:
-        user_id = get_jwt_identity()
-        user = User.query_active().filter_by(id=int(user_id)).first()
-        if not user:
+        claims = get_current_claims()
+        if not claims:
             return error_response("User not found", 404)
+        user_id, role = claims
 
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        logging.info(f"User {user_id} (role: {role}) fetching orders, args: {request.args.to_dict()}")
 
-        logging.info(f"User {user_id} (role: {user.role}) fetching orders, page: {page}, per_page: {per_page}")
-
-        if user.role == 'admin':
-            orders_paginated = Order.query_active().order_by(Order.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+        if role == 'admin':
+            query = Order.query_active()
         else:
-            orders_paginated = Order.query_active().filter_by(user_id=int(user_id)).order_by(Order.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            query = Order.query_active().filter_by(user_id=int(user_id))
 
-        return jsonify({
-            "orders": [order.serialize_with_service() for order in orders_paginated.items],
-            "total": orders_paginated.total,
-            "pages": orders_paginated.pages
-        }), 200
+        return jsonify(paginate_orders(query)), 200
     except ValueError as ve:
         logging.error(f"ValueError in get_orders: {str(ve)}")
         return error_response("Invalid request parameters", 400)
@@ -489,11 +1008,11 @@ def get_orders():
 def update_order_status(order_id):
     """Admin updates the status of an order."""
     try:
-        user_id = get_jwt_identity()
-        user = User.query_active().filter_by(id=int(user_id)).first()
-        if not user:
+        claims = get_current_claims()
+        if not claims:
             return error_response("User not found", 404)
-        if user.role != 'admin':
+        user_id, role = claims
+        if role != 'admin':
             return error_response("Unauthorized - Admin access required", 403)
 
         data = UpdateOrderSchema().load(request.get_json())
@@ -505,7 +1024,11 @@ def update_order_status(order_id):
         order.status = OrderStatus(data['status'])
         db.session.commit()
 
-        socketio.emit("order_updated", order.serialize_with_service())
+        events.emit("order_updated", f"order:{order.id}", {
+            "id": order.id,
+            "user_id": order.user_id,
+            "status": order.status.value
+        }, to=order_rooms(order.user_id))
         logging.info(f"Order {order_id} status updated to {data['status']} by admin {user_id}")
         return jsonify({"message": "Order status updated successfully", "order": order.serialize_with_service()}), 200
     except ValidationError as err:
@@ -531,9 +1054,23 @@ def get_server_ip():
         return error_response("Unable to determine server IP", 500)
 
 @socketio.on('connect')
-def handle_connect():
-    """Log Socket.IO client connections."""
-    logging.info(f"Client connected: {request.sid}")
+def handle_connect(auth=None):
+    """Authenticate a Socket.IO client by JWT and join its user and role rooms."""
+    token = (auth or {}).get("token") or request.args.get("token")
+    if not token:
+        logging.warning(f"Socket.IO connection without token rejected: {request.sid}")
+        raise ConnectionRefusedError("Authentication required")
+    try:
+        claims = decode_token(token)
+    except Exception as e:
+        logging.warning(f"Socket.IO connection with invalid token rejected: {str(e)}")
+        raise ConnectionRefusedError("Invalid token")
+
+    user_id = int(claims["sub"])
+    join_room(user_room(user_id))
+    if claims.get("role") == "admin":
+        join_room(ADMIN_ROOM)
+    logging.info(f"Client connected: {request.sid} (user {user_id}, role {claims.get('role', 'user')})")
 
 @socketio.on('disconnect')
 def handle_disconnect():
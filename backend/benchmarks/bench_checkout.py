@@ -0,0 +1,51 @@
+"""Cost of a synchronous checkout (POST /api/mpesa/payment) as the cart grows.
+
+For each cart size the user's cart is filled with that many distinct services
+and the real payment route is called `--repeat` times. Reports the SQL
+statements per checkout (from X-Query-Count) and the median time per checkout.
+The Daraja STK push is replaced by a stub that returns a CheckoutRequestID at
+once, so only the app and database work is measured.
+
+    python benchmarks/bench_checkout.py --sizes 1 10 50 200
+"""
+import argparse
+import statistics
+import time
+import uuid
+from common import configure_env, load_app, seed, auth_header
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    configure_env(QUERY_COUNT_HEADER="true")
+    app = load_app()
+    from mpesa import mpesa_client
+    from models import db, Cart
+
+    mpesa_client.stk_push = lambda payload: {"CheckoutRequestID": f"ws_CO_{uuid.uuid4().hex}", "ResponseCode": "0"}
+    _, (user_id,), service_ids = seed(app, users=1, services=max(args.sizes))
+    headers = auth_header(app, user_id)
+    client = app.test_client()
+
+    print(f"{'cart lines':>10} {'queries':>8} {'median ms':>10} {'ms/line':>8}")
+    for size in args.sizes:
+        timings = []
+        queries = set()
+        for _ in range(args.repeat):
+            with app.app_context():
+                db.session.add_all(Cart(user_id=user_id, service_id=service_id, quantity=2, location="Bench")
+                                   for service_id in service_ids[:size])
+                db.session.commit()
+            start = time.perf_counter()
+            response = client.post("/api/mpesa/payment", json={"phone_number": "254700000000"}, headers=headers)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.get_data(as_text=True)
+            queries.add(int(response.headers["X-Query-Count"]))
+        median_ms = statistics.median(timings) * 1000
+        print(f"{size:>10} {'/'.join(map(str, sorted(queries))):>8} {median_ms:>10.2f} {median_ms / size:>8.3f}")
+
+if __name__ == "__main__":
+    main()
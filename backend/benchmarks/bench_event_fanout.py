@@ -0,0 +1,68 @@
+"""Socket.IO fan-out of order updates: room-targeted emits versus global broadcasts.
+
+Connects `--users` customers (each with `--clients` sockets) and one admin
+through Flask-SocketIO's test client, then has the admin change the status of
+one user's order `--updates` times through PATCH /api/orders/<id>. Reports how
+many event packets were delivered in total and per update, and how long the
+updates took.
+
+`--mode broadcast` reproduces the behaviour before per-user rooms by dropping
+the `to=` rooms from every emit, so every connected client receives every event.
+
+    python benchmarks/bench_event_fanout.py --users 200 --updates 50
+    python benchmarks/bench_event_fanout.py --users 200 --updates 50 --mode broadcast
+"""
+import argparse
+import time
+from common import configure_env, load_app, seed, auth_header
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=1, help="sockets per user")
+    parser.add_argument("--updates", type=int, default=50)
+    parser.add_argument("--mode", choices=["rooms", "broadcast"], default="rooms")
+    args = parser.parse_args()
+
+    # Send every event as soon as it is emitted so each update is one delivery
+    configure_env(EVENT_COALESCE_WINDOW="0")
+    app = load_app()
+    from app import socketio
+    from flask_jwt_extended import create_access_token
+
+    admin_id, user_ids, _ = seed(app, users=args.users, services=1, orders_per_user=1)
+
+    if args.mode == "broadcast":
+        emit = socketio.emit
+        socketio.emit = lambda event, *payload, to=None, **kwargs: emit(event, *payload, **kwargs)
+
+    with app.app_context():
+        from models import Order
+        order_id = Order.query.filter_by(user_id=user_ids[0]).first().id
+        tokens = {user_id: create_access_token(identity=str(user_id), additional_claims={"role": "user"}) for user_id in user_ids}
+        admin_token = create_access_token(identity=str(admin_id), additional_claims={"role": "admin"})
+    sockets = [socketio.test_client(app, auth={"token": admin_token})]
+    for user_id in user_ids:
+        sockets.extend(socketio.test_client(app, auth={"token": tokens[user_id]}) for _ in range(args.clients))
+    for client in sockets:
+        client.get_received()
+
+    http = app.test_client()
+    headers = auth_header(app, admin_id, role="admin")
+    statuses = ["Processing", "Pending"]
+
+    start = time.perf_counter()
+    for i in range(args.updates):
+        response = http.patch(f"/api/orders/{order_id}", json={"status": statuses[i % 2]}, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    elapsed = time.perf_counter() - start
+
+    received = [len(client.get_received()) for client in sockets]
+    interested = 1 + args.clients  # the admin and the order owner's sockets
+    print(f"mode={args.mode} sockets={len(sockets)} updates={args.updates}")
+    print(f"  packets delivered: {sum(received)} ({sum(received) / args.updates:.1f} per update, {interested} interested sockets)")
+    print(f"  sockets that received anything: {sum(1 for count in received if count)}")
+    print(f"  time: {elapsed:.3f}s ({elapsed / args.updates * 1000:.2f} ms per update)")
+
+if __name__ == "__main__":
+    main()
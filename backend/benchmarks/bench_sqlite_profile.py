@@ -0,0 +1,122 @@
+"""Concurrent read/write throughput on a SQLite file, with and without the production profile.
+
+Reader threads call GET /api/orders/my, /api/cart/summary and
+/api/services/<category>. Writer threads add to their cart (POST /api/cart)
+and, as the admin, change order statuses (PATCH /api/orders/<id>). All calls
+go through the real routes via the Flask test client for `--seconds` seconds.
+Each profile runs in its own process, because the profile is applied when the
+app module is imported.
+
+    python benchmarks/bench_sqlite_profile.py --readers 8 --writers 4 --seconds 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILES = ("default", "production")
+
+def run_load(args):
+    from common import configure_env, load_app, seed, auth_header
+
+    env = {"EVENT_COALESCE_WINDOW": "0"}
+    if args.profile == "production":
+        env["DB_PROFILE"] = "production"
+    configure_env(**env)
+    app = load_app()
+    from models import Order
+
+    admin_id, user_ids, service_ids = seed(app, users=args.readers + args.writers, services=20, orders_per_user=5)
+    with app.app_context():
+        order_ids = [order_id for (order_id,) in Order.query.with_entities(Order.id)]
+    admin_headers = auth_header(app, admin_id, role="admin")
+
+    stop = threading.Event()
+    counts = Counter()
+    latencies = {"read": [], "write": []}
+    lock = threading.Lock()
+
+    def record(kind, response, elapsed):
+        with lock:
+            counts[f"{kind}_{'ok' if response.status_code < 400 else 'error'}"] += 1
+            latencies[kind].append(elapsed)
+
+    def reader(user_id):
+        client = app.test_client()
+        headers = auth_header(app, user_id)
+        paths = ["/api/orders/my?cursor=", "/api/cart/summary", "/api/services/cleaning"]
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.get(paths[i % len(paths)], headers=headers)
+            record("read", response, time.perf_counter() - start)
+            i += 1
+
+    def writer(user_id):
+        client = app.test_client()
+        headers = auth_header(app, user_id)
+        statuses = ["Processing", "Pending"]
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            if i % 2:
+                order_id = order_ids[(user_id * 7 + i) % len(order_ids)]
+                response = client.patch(f"/api/orders/{order_id}", json={"status": statuses[i // 2 % 2]}, headers=admin_headers)
+            else:
+                service_id = service_ids[i // 2 % len(service_ids)]
+                response = client.post("/api/cart", json={"service_id": service_id, "quantity": 1, "location": "Bench"}, headers=headers)
+            record("write", response, time.perf_counter() - start)
+            i += 1
+
+    threads = [threading.Thread(target=reader, args=(user_id,)) for user_id in user_ids[:args.readers]]
+    threads += [threading.Thread(target=writer, args=(user_id,)) for user_id in user_ids[args.readers:]]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95)] * 1000 if values else 0.0
+
+    print(json.dumps({
+        "profile": args.profile,
+        "reads_per_s": counts["read_ok"] / args.seconds,
+        "writes_per_s": counts["write_ok"] / args.seconds,
+        "read_errors": counts["read_error"],
+        "write_errors": counts["write_error"],
+        "read_p95_ms": p95(latencies["read"]),
+        "write_p95_ms": p95(latencies["write"]),
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profile", choices=PROFILES, help="run one profile in this process")
+    args = parser.parse_args()
+
+    if args.profile:
+        run_load(args)
+        return
+
+    print(f"{'profile':>10} {'reads/s':>8} {'writes/s':>9} {'read p95':>9} {'write p95':>10} {'errors (r/w)':>13}")
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--profile", profile, "--readers", str(args.readers),
+             "--writers", str(args.writers), "--seconds", str(args.seconds)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:>10} {result['reads_per_s']:>8.1f} {result['writes_per_s']:>9.1f} "
+              f"{result['read_p95_ms']:>7.1f}ms {result['write_p95_ms']:>8.1f}ms "
+              f"{result['read_errors']:>6}/{result['write_errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Helpers shared by the benchmark scripts in this directory.
+
+The scripts import the backend modules directly, so the environment has to be
+configured before `app` is first imported.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def configure_env(db_path=None, **overrides):
+    """Point the app at a scratch SQLite file and cheap password hashing; returns the file path."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+    return db_path
+
+def load_app():
+    """Import the app and create its schema."""
+    from app import app
+    from cli import migrate_database
+
+    with app.app_context():
+        migrate_database()
+    return app
+
+def seed(app, users: int, services: int = 10, orders_per_user: int = 0):
+    """Create `users` customers plus one admin, `services` services and some orders.
+
+    Returns (admin_id, [user ids], [service ids]).
+    """
+    from models import db, User, Service, Order
+
+    with app.app_context():
+        admin = User(username="bench-admin", password="bench", role="admin")
+        customers = [User(username=f"bench-user-{i}", password="bench") for i in range(users)]
+        catalog = [Service(category="cleaning", name=f"Bench Service {i}", price=100 + i) for i in range(services)]
+        db.session.add_all([admin, *customers, *catalog])
+        db.session.flush()
+        for user in customers:
+            for i in range(orders_per_user):
+                service = catalog[i % len(catalog)]
+                db.session.add(Order(
+                    user_id=user.id, service_id=service.id, quantity=1,
+                    location="Bench", total_price=service.price
+                ))
+        db.session.commit()
+        return admin.id, [user.id for user in customers], [service.id for service in catalog]
+
+def auth_header(app, user_id, role="user"):
+    """Authorization header for a user, without going through /api/login."""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+    return {"Authorization": f"Bearer {token}"}
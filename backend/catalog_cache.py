@@ -0,0 +1,106 @@
+import os
+import time
+import hashlib
+import json
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger('app')
+
+class CatalogCache:
+    """Process-level cache of serialized service catalog responses.
+
+    Entries are tagged with the catalog version they were built from. The
+    version lives in the database (CatalogVersion) so writes made by other
+    processes, such as `flask seed` or `flask import-services`, are noticed:
+    ensure_current() re-reads it at most every `ttl` seconds and drops every
+    cached response when it has moved.
+
+    Per-key responses are kept in an LRU of at most `max_entries`, since keys
+    include client-chosen paging parameters.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version = 0
+        self._checked_at = None
+        self._entries = OrderedDict()
+        self._snapshot = None
+        self._categories = frozenset()
+
+    @property
+    def version(self) -> int:
+        """Current catalog version."""
+        return self._version
+
+    def ensure_current(self, load_version):
+        """Re-read the stored catalog version via load_version() once the TTL has passed."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.ttl:
+            return
+        version = load_version()
+        with self._lock:
+            self._checked_at = now
+            if version != self._version:
+                self._version = version
+                self._entries.clear()
+                self._snapshot = None
+                self._categories = frozenset()
+                logger.info(f"✅ Service catalog cache reset for catalog version {version}")
+
+    def get(self, key):
+        """Return the cached (body, etag) for a key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get((self._version, key))
+            if entry is not None:
+                self._entries.move_to_end((self._version, key))
+            return entry
+
+    def set(self, key, body: bytes) -> str:
+        """Cache serialized response bytes for a key and return their ETag."""
+        with self._lock:
+            etag = f"{self._version}-{hashlib.sha1(body).hexdigest()[:16]}"
+            self._entries[(self._version, key)] = (body, etag)
+            self._entries.move_to_end((self._version, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return etag
+
+    def snapshot(self):
+        """Return the precomputed whole-catalog (body, version), or None if not built yet."""
+        return self._snapshot
+
+    def categories(self) -> frozenset:
+        """Names of the categories in the current snapshot."""
+        return self._categories
+
+    def set_snapshot(self, categories: dict):
+        """Store the whole catalog, grouped by category, as response bytes stamped with a content hash."""
+        canonical = json.dumps(categories, sort_keys=True, separators=(",", ":"))
+        version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+        body = json.dumps({"version": version, "categories": categories}, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._snapshot = (body, version)
+            self._categories = frozenset(categories)
+        logger.info(f"✅ Service catalog snapshot built (version {version}, {len(categories)} categories)")
+        return version
+
+    def invalidate(self):
+        """Drop all cached responses and re-read the stored version on the next request.
+
+        Call after committing a write that bumped CatalogVersion.
+        """
+        with self._lock:
+            self._checked_at = None
+            self._entries.clear()
+            self._snapshot = None
+            self._categories = frozenset()
+        logger.info("✅ Service catalog cache invalidated")
+
+catalog_cache = CatalogCache(
+    ttl=float(os.getenv('CATALOG_VERSION_TTL', '5')),
+    max_entries=int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', '256'))
+)
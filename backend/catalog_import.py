@@ -0,0 +1,200 @@
+import os
+import io
+import math
+import csv
+import logging
+from collections import Counter
+from models import db, CatalogVersion
+from catalog_cache import catalog_cache
+from jobs import JobQueue
+from populate_services import iter_json_array, upsert_services, UPSERT_CHUNK_SIZE
+
+logger = logging.getLogger('app')
+
+CATALOG_FORMATS = ("csv", "json")
+MAX_REPORTED_ERRORS = int(os.getenv('CATALOG_IMPORT_MAX_ERRORS', '500'))
+
+_TRUE_VALUES = {"true", "1", "yes", "y"}
+_FALSE_VALUES = {"false", "0", "no", "n"}
+
+def detect_catalog_format(filename="", content_type=""):
+    """Guess "csv" or "json" from an upload's filename or content type, or return None."""
+    filename = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if filename.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if filename.endswith(".json") or "json" in content_type:
+        return "json"
+    return None
+
+def read_catalog_records(data: bytes, fmt: str) -> list:
+    """Parse an uploaded CSV or JSON-array catalog into a list of raw records."""
+    text = io.StringIO(data.decode("utf-8-sig"))
+    if fmt == "csv":
+        return list(csv.DictReader(text))
+    if fmt == "json":
+        return list(iter_json_array(text))
+    raise ValueError(f"Unsupported catalog format: {fmt}")
+
+def _column(records, field):
+    """Return one field of every record, with strings stripped and blanks as None."""
+    values = []
+    for record in records:
+        value = record.get(field) if isinstance(record, dict) else None
+        if isinstance(value, str):
+            value = value.strip() or None
+        values.append(value)
+    return values
+
+def _to_price(value):
+    if isinstance(value, bool):
+        raise ValueError
+    price = float(value)
+    if not math.isfinite(price):
+        raise ValueError
+    return price
+
+def _to_bool(value):
+    if value is None:
+        return True
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError
+
+def validate_catalog_rows(records):
+    """Validate a whole upload column by column.
+
+    Returns (rows, errors): rows are ready for upsert_services, and errors is a
+    list of {"row": n, "name": ..., "errors": [...]} with n counting records
+    from 1. A record with any error is left out of rows.
+    """
+    problems = {}
+
+    def fail(index, message):
+        problems.setdefault(index, []).append(message)
+
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            fail(index, "Row must be an object")
+
+    names = _column(records, "name")
+    categories = _column(records, "category")
+    prices = _column(records, "price")
+    currencies = _column(records, "currency")
+    descriptions = _column(records, "description")
+    actives = _column(records, "is_active")
+
+    name_counts = Counter(name for name in names if isinstance(name, str))
+    for index, name in enumerate(names):
+        if not name:
+            fail(index, "name is required")
+        elif not isinstance(name, str):
+            fail(index, "name must be a string")
+        elif len(name) > 100:
+            fail(index, "name must be at most 100 characters")
+        elif name_counts[name] > 1:
+            fail(index, f"name '{name}' appears more than once in the upload")
+
+    for index, category in enumerate(categories):
+        if not category:
+            fail(index, "category is required")
+        elif not isinstance(category, str):
+            fail(index, "category must be a string")
+        elif len(category) > 50:
+            fail(index, "category must be at most 50 characters")
+
+    parsed_prices = []
+    for index, price in enumerate(prices):
+        try:
+            parsed = _to_price(price)
+            if parsed < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            fail(index, "price must be a non-negative number")
+            parsed = None
+        parsed_prices.append(parsed)
+
+    currencies = [currency or "KES" for currency in currencies]
+    for index, currency in enumerate(currencies):
+        if not isinstance(currency, str) or len(currency) != 3:
+            fail(index, "currency must be a 3-character code")
+
+    descriptions = [description or "" for description in descriptions]
+    for index, description in enumerate(descriptions):
+        if not isinstance(description, str) or len(description) > 255:
+            fail(index, "description must be a string of at most 255 characters")
+
+    parsed_actives = []
+    for index, active in enumerate(actives):
+        try:
+            parsed = _to_bool(active)
+        except ValueError:
+            fail(index, "is_active must be true or false")
+            parsed = None
+        parsed_actives.append(parsed)
+
+    rows = [
+        {
+            "category": categories[index],
+            "name": names[index],
+            "price": parsed_prices[index],
+            "currency": currencies[index],
+            "description": descriptions[index],
+            "is_active": parsed_actives[index]
+        }
+        for index in range(len(records)) if index not in problems
+    ]
+    errors = [
+        {"row": index + 1, "name": names[index] if isinstance(names[index], str) else None, "errors": messages}
+        for index, messages in sorted(problems.items())
+    ]
+    return rows, errors
+
+def import_catalog(data: bytes, fmt: str, progress=None, chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
+    """Validate and upsert an uploaded catalog; must run inside an app context.
+
+    Each chunk is committed on its own, so a failure part-way keeps the chunks
+    already written. `progress(**fields)` is called after validation and after
+    every chunk.
+    """
+    progress = progress or (lambda **fields: None)
+    records = read_catalog_records(data, fmt)
+    rows, errors = validate_catalog_rows(records)
+    progress(
+        status="running",
+        total=len(rows),
+        processed=0,
+        invalid=len(errors),
+        errors=errors[:MAX_REPORTED_ERRORS]
+    )
+
+    changed = 0
+    try:
+        for start in range(0, len(rows), chunk_size):
+            chunk_changed = upsert_services(rows[start:start + chunk_size])
+            if chunk_changed:
+                CatalogVersion.bump()
+            db.session.commit()
+            changed += chunk_changed
+            progress(processed=min(start + chunk_size, len(rows)), changed=changed)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if changed:
+            # Cached catalog responses in this process no longer match the database
+            catalog_cache.invalidate()
+
+    logger.info(f"✅ Catalog import finished: {len(rows)} valid rows, {changed} changed, {len(errors)} invalid")
+    return {"records": len(records), "valid": len(rows), "changed": changed, "invalid": len(errors)}
+
+import_jobs = JobQueue(
+    workers=1,
+    max_pending=int(os.getenv('CATALOG_IMPORT_MAX_PENDING', '4')),
+    name="import"
+)
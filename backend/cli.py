@@ -0,0 +1,122 @@
+import os
+import logging
+import click
+from sqlalchemy import text
+from models import db, User
+
+logger = logging.getLogger('app')
+
+def merge_duplicate_cart_lines():
+    """Fold live cart lines with the same (user_id, service_id, location) into the lowest id.
+
+    Quantities are summed into the surviving row and the others are deleted,
+    so uq_cart_user_service_location can be created on an existing database.
+    Returns the number of rows removed.
+    """
+    keepers = (
+        "SELECT MIN(id) FROM cart WHERE deleted_at IS NULL "
+        "GROUP BY user_id, service_id, location"
+    )
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE cart SET quantity = ("
+            "  SELECT SUM(dup.quantity) FROM cart AS dup"
+            "  WHERE dup.user_id = cart.user_id AND dup.service_id = cart.service_id"
+            "  AND dup.location = cart.location AND dup.deleted_at IS NULL"
+            ") WHERE deleted_at IS NULL AND id IN ("
+            f"  {keepers} HAVING COUNT(*) > 1"
+            ")"
+        ))
+        removed = conn.execute(text(
+            f"DELETE FROM cart WHERE deleted_at IS NULL AND id NOT IN ({keepers})"
+        )).rowcount
+    if removed:
+        logger.info(f"✅ Merged {removed} duplicate cart lines")
+    return removed
+
+# Indexes older schemas created that a composite index now covers
+SUPERSEDED_INDEXES = (
+    "ix_order_created_at_id",        # by ix_order_active_created_at_id
+    "ix_order_checkout_request_id",  # by ix_order_checkout_request_id_status
+)
+
+def migrate_database():
+    """Create missing tables, then any indexes missing from tables that already existed.
+
+    Indexes in SUPERSEDED_INDEXES are dropped so writes stop maintaining them.
+    """
+    db.create_all()
+    with db.engine.begin() as conn:
+        for name in SUPERSEDED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    # The unique cart index cannot be built while duplicate live lines exist
+    merge_duplicate_cart_lines()
+    # create_all skips existing tables entirely, including indexes added to them later
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    logger.info("✅ Database schema is up to date")
+
+def seed_database(app, services: bool = True):
+    """Create the initial admin user if there are no users, then sync services.json."""
+    if not User.query.first():
+        admin = User(
+            username=os.getenv('ADMIN_USERNAME', 'admin'),
+            password=os.getenv('ADMIN_PASSWORD', 'admin123'),
+            role="admin"
+        )
+        db.session.add(admin)
+        db.session.commit()
+        logger.info("✅ Admin user seeded successfully")
+    if services:
+        from populate_services import populate_services
+        populate_services(app)
+
+def register_commands(app):
+    """Register the `flask migrate`, `flask seed`, `flask import-services` and `flask check-query-plans` commands on the app."""
+
+    @app.cli.command("migrate")
+    def migrate_command():
+        """Create missing tables and indexes."""
+        migrate_database()
+        click.echo("Database schema is up to date.")
+
+    @app.cli.command("seed")
+    @click.option("--skip-services", is_flag=True, help="Only seed the admin user.")
+    def seed_command(skip_services):
+        """Seed the admin user and the service catalog."""
+        seed_database(app, services=not skip_services)
+        click.echo("Seed data loaded.")
+
+    @app.cli.command("import-services")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "json"]), help="Defaults to the file extension.")
+    def import_services_command(path, fmt):
+        """Validate and upsert a CSV or JSON service catalog in chunks."""
+        from catalog_import import import_catalog, detect_catalog_format
+
+        fmt = fmt or detect_catalog_format(path)
+        if fmt is None:
+            raise click.UsageError("Cannot tell the format from the file name; pass --format")
+
+        def progress(**fields):
+            for error in fields.get("errors", []):
+                click.echo(f"Row {error['row']} ({error['name']}): {'; '.join(error['errors'])}", err=True)
+            if "processed" in fields and "total" not in fields:
+                click.echo(f"Imported {fields['processed']} rows ({fields['changed']} changed)")
+
+        with open(path, "rb") as f:
+            result = import_catalog(f.read(), fmt, progress=progress)
+        click.echo(f"Done: {result['valid']} valid, {result['changed']} changed, {result['invalid']} invalid.")
+
+    @app.cli.command("check-query-plans")
+    def check_query_plans_command():
+        """Fail if any hot route's SQL does a full table scan or a temp B-tree sort."""
+        from query_plans import check_route_plans
+
+        problems = check_route_plans(app)
+        for problem in problems:
+            click.echo(f"{problem['route']}: {problem['step']}\n  {problem['statement']}\n  plan: {problem['plan']}", err=True)
+        if problems:
+            raise click.ClickException(f"{len(problems)} query plan problem(s) found")
+        click.echo("All hot route queries use indexes.")
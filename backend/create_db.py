@@ -1,7 +1,9 @@
-from app import app, db
+from app import app
+from cli import migrate_database, seed_database
 
 # Push an application context
 with app.app_context():
-    # Create all tables
-    db.create_all()
-    print("Database tables created successfully.")
\ No newline at end of file
+    # Create all tables and indexes, then the admin user and service catalog
+    migrate_database()
+    seed_database(app)
+    print("Database tables created and seeded successfully.")
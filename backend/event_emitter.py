@@ -0,0 +1,93 @@
+import queue
+import threading
+import logging
+
+logger = logging.getLogger('app')
+
+class CoalescingEmitter:
+    """Buffer Socket.IO events for a short window and send merged delta batches.
+
+    Each event is identified by a key (e.g. "order:42"); repeated events for the
+    same key, event name and rooms within the window are merged into a single
+    delta, with later fields overriding earlier ones. Each flush sends one
+    `{"updates": [...]}` payload per (event, rooms) pair.
+
+    emit() only puts the event on a thread-safe queue, so it can be called from
+    request handlers and from plain worker threads alike. The queue is drained
+    by one long-lived background task on the server's event loop, started with
+    start(); with eventlet, a task started from a worker thread would never run.
+    A window of 0 sends each event synchronously from emit(), which is only
+    safe when every emit happens on the event loop (e.g. under the test client).
+    """
+
+    def __init__(self, socketio, window: float = 0.2):
+        self.socketio = socketio
+        self.window = window
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self.received = 0
+        self.coalesced = 0
+        self.emitted = 0
+
+    def start(self):
+        """Start the flush loop on the Socket.IO event loop; call once from the server's main thread."""
+        with self._lock:
+            if self._started or self.window <= 0:
+                return
+            self._started = True
+        self.socketio.start_background_task(self._run)
+
+    def emit(self, event: str, key, delta: dict, to):
+        """Queue a delta for `event` addressed to room(s) `to`."""
+        rooms = tuple(to) if isinstance(to, (list, tuple)) else (to,)
+        with self._lock:
+            self.received += 1
+        if self.window <= 0:
+            self._send(event, rooms, [delta])
+            return
+        self._queue.put((event, rooms, key, dict(delta)))
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Event emitter flush failed: {str(e)}")
+
+    def flush(self):
+        """Merge and send everything queued so far."""
+        pending = {}
+        coalesced = 0
+        while True:
+            try:
+                event, rooms, key, delta = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            bucket = pending.setdefault((event, rooms), {})
+            if key in bucket:
+                bucket[key].update(delta)
+                coalesced += 1
+            else:
+                bucket[key] = delta
+        if coalesced:
+            with self._lock:
+                self.coalesced += coalesced
+        for (event, rooms), bucket in pending.items():
+            self._send(event, rooms, list(bucket.values()))
+        if pending:
+            logger.debug(f"Event emitter flushed: {self.stats()}")
+
+    def _send(self, event, rooms, updates):
+        try:
+            self.socketio.emit(event, {"updates": updates}, to=list(rooms))
+            with self._lock:
+                self.emitted += 1
+        except Exception as e:
+            logger.error(f"Failed to emit {event} to {rooms}: {str(e)}")
+
+    def stats(self) -> dict:
+        """Counts of events received, merged into an earlier delta, and batches sent."""
+        with self._lock:
+            return {"received": self.received, "coalesced": self.coalesced, "emitted": self.emitted}
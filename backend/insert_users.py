@@ -1,19 +1,19 @@
 from app import app, db, User
 from flask_bcrypt import generate_password_hash
 
-# Push an application context
+# Push an application context (importing app no longer touches the database)
 with app.app_context():
     # Create an admin user
     admin = User(
         username='admin',
-        password=generate_password_hash('adminpassword').decode('utf-8'),
+        password_hash=generate_password_hash('adminpassword').decode('utf-8'),
         role='admin'
     )
 
     # Create a regular user
     user = User(
         username='user',
-        password=generate_password_hash('userpassword').decode('utf-8'),
+        password_hash=generate_password_hash('userpassword').decode('utf-8'),
         role='user'
     )
 
@@ -0,0 +1,98 @@
+import time
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('app')
+
+class QueueFull(Exception):
+    """Raised when a job queue has no room for another job."""
+
+class JobAlreadyPending(Exception):
+    """Raised by an exclusive submit while the owner still has an unfinished job."""
+
+    def __init__(self, job_id):
+        super().__init__(f"Job {job_id} is still pending")
+        self.job_id = job_id
+
+class JobQueue:
+    """Bounded background worker pool with an in-memory job status table.
+
+    Jobs are plain callables; their return value (or error message) is kept for
+    `result_ttl` seconds so clients that missed the push can poll for it.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 100, result_ttl: float = 600.0, name: str = "job"):
+        self.name = name
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, owner_id, fn, *args, exclusive: bool = False) -> str:
+        """Queue fn(job_id, *args) and return the new job id.
+
+        With `exclusive`, raises JobAlreadyPending if the owner already has an
+        unfinished job in this queue.
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if exclusive:
+                active = self._active_job(owner_id)
+                if active:
+                    raise JobAlreadyPending(active)
+            if not self._slots.acquire(blocking=False):
+                raise QueueFull(f"{self.name.capitalize()} queue is full")
+            self._prune()
+            self._jobs[job_id] = {"job_id": job_id, "owner_id": owner_id, "status": "pending", "finished_at": None}
+        self._executor.submit(self._run, job_id, fn, *args)
+        return job_id
+
+    def _run(self, job_id, fn, *args):
+        try:
+            result = fn(job_id, *args)
+            self._finish(job_id, status="completed", result=result)
+        except Exception as e:
+            logger.error(f"{self.name.capitalize()} job {job_id} failed: {str(e)}")
+            self._finish(job_id, status="failed", error=str(e))
+        finally:
+            self._slots.release()
+
+    def update(self, job_id, **fields):
+        """Merge progress fields into a running job's status record."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _finish(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, finished_at=time.monotonic())
+
+    def _active_job(self, owner_id):
+        for job_id, job in self._jobs.items():
+            if job["owner_id"] == owner_id and job["finished_at"] is None:
+                return job_id
+        return None
+
+    def active_job(self, owner_id):
+        """Return the id of the owner's unfinished job, or None."""
+        with self._lock:
+            return self._active_job(owner_id)
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def status(self, job_id):
+        """Return a copy of the job's status record, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return {k: v for k, v in job.items() if k != "finished_at"} if job else None
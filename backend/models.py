@@ -1,11 +1,21 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from sqlalchemy.orm import joinedload
+from user_cache import user_existence_cache
 from datetime import datetime
 from enum import Enum
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 
+def upsert_insert(model):
+    """Return an INSERT for `model` that supports ON CONFLICT for the current database dialect."""
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 class OrderStatus(Enum):
     PENDING = "Pending"
     PROCESSING = "Processing"
@@ -33,15 +43,18 @@ class User(db.Model):
     orders = db.relationship("Order", back_populates="user", lazy="dynamic", cascade="all, delete-orphan")
     cart_items = db.relationship("Cart", back_populates="user", lazy="dynamic", cascade="all, delete-orphan")
 
-    def __init__(self, username: str, password: str, role: str = "user"):
+    def __init__(self, username: str, password: str = None, role: str = "user", password_hash: str = None):
         if not isinstance(username, str) or not username.strip():
             raise ValueError("Username must be a non-empty string")
-        if not isinstance(password, str) or not password.strip():
+        if password_hash is None and (not isinstance(password, str) or not password.strip()):
             raise ValueError("Password must be a non-empty string")
         if role not in ["user", "admin"]:
             raise ValueError("Role must be 'user' or 'admin'")
         self.username = username
-        self.password = password
+        if password_hash is not None:
+            self.password_hash = password_hash
+        else:
+            self.password = password
         self.role = role
 
     def verify_password(self, password: str) -> bool:
@@ -55,10 +68,21 @@ class User(db.Model):
     def password(self, password: str):
         self._password = bcrypt.generate_password_hash(password).decode("utf-8")
 
+    @property
+    def password_hash(self) -> str:
+        """The stored bcrypt hash, for verification off the request thread."""
+        return self._password
+
+    @password_hash.setter
+    def password_hash(self, password_hash: str):
+        """Store a bcrypt hash computed elsewhere (e.g. by the password hasher pool)."""
+        self._password = password_hash
+
     def delete(self):
         """Soft delete the user by setting the deleted_at timestamp."""
         self.deleted_at = datetime.utcnow()
         db.session.commit()
+        user_existence_cache.invalidate(self.id)
 
     @classmethod
     def query_active(cls):
@@ -81,13 +105,21 @@ class User(db.Model):
 
     def serialize_orders(self) -> list:
         """Serialize the user's orders with service details."""
-        return [order.serialize_with_service() for order in self.orders]
+        return [order.serialize_with_service() for order in self.orders.options(joinedload(Order.service))]
 
     def __repr__(self):
         return f"<User id={self.id} username={self.username} role={self.role}>"
 
 class Service(db.Model):
     __tablename__ = "service"
+    __table_args__ = (
+        # Category listings and the catalog snapshot, sorted by name
+        db.Index(
+            "ix_service_active_category_name", "category", "name",
+            sqlite_where=db.text("deleted_at IS NULL"),
+            postgresql_where=db.text("deleted_at IS NULL"),
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(50), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False, unique=True, index=True)
@@ -155,8 +187,60 @@ class Service(db.Model):
     def __repr__(self):
         return f"<Service id={self.id} category={self.category} name={self.name}>"
 
+class CatalogSource(db.Model):
+    """Content hash of the last catalog file applied to the service table."""
+    __tablename__ = "catalog_source"
+    source = db.Column(db.String(255), primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CatalogSource source={self.source} content_hash={self.content_hash}>"
+
+class CatalogVersion(db.Model):
+    """Single-row counter bumped by every write to the service catalog.
+
+    Every server process compares it with its cached copy (see CatalogCache), so
+    catalog changes made by other processes reach all of them.
+    """
+    __tablename__ = "catalog_version"
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def current(cls) -> int:
+        """Return the stored catalog version (0 before the first write)."""
+        return db.session.query(cls.version).filter_by(id=1).scalar() or 0
+
+    @classmethod
+    def bump(cls):
+        """Increment the catalog version in the current transaction."""
+        now = datetime.utcnow()
+        stmt = upsert_insert(cls).values(id=1, version=1, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"version": cls.version + 1, "updated_at": now}
+        )
+        db.session.execute(stmt)
+
 class Cart(db.Model):
     __tablename__ = "cart"
+    __table_args__ = (
+        # One live line per service and location; soft-deleted rows are ignored
+        db.Index(
+            "uq_cart_user_service_location", "user_id", "service_id", "location",
+            unique=True,
+            sqlite_where=db.text("deleted_at IS NULL"),
+            postgresql_where=db.text("deleted_at IS NULL"),
+        ),
+        # Cart view in insertion order
+        db.Index(
+            "ix_cart_user_created_at_id", "user_id", "created_at", "id",
+            sqlite_where=db.text("deleted_at IS NULL"),
+            postgresql_where=db.text("deleted_at IS NULL"),
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
     service_id = db.Column(db.Integer, db.ForeignKey("service.id"), nullable=False, index=True)
@@ -224,6 +308,22 @@ class Cart(db.Model):
 
 class Order(db.Model):
     __tablename__ = "order"
+    __table_args__ = (
+        # Admin order list (keyset and offset pages, and its count)
+        db.Index(
+            "ix_order_active_created_at_id", "created_at", "id",
+            sqlite_where=db.text("deleted_at IS NULL"),
+            postgresql_where=db.text("deleted_at IS NULL"),
+        ),
+        # A user's own orders, newest first
+        db.Index(
+            "ix_order_user_created_at_id", "user_id", "created_at", "id",
+            sqlite_where=db.text("deleted_at IS NULL"),
+            postgresql_where=db.text("deleted_at IS NULL"),
+        ),
+        # M-Pesa callbacks look up PROCESSING orders by checkout id
+        db.Index("ix_order_checkout_request_id_status", "checkout_request_id", "status"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
     service_id = db.Column(db.Integer, db.ForeignKey("service.id"), nullable=False, index=True)
@@ -231,7 +331,7 @@ class Order(db.Model):
     location = db.Column(db.String(255), nullable=False, default="")
     total_price = db.Column(db.Float, nullable=False)
     status = db.Column(db.Enum(OrderStatus), nullable=False, default=OrderStatus.PENDING, index=True)
-    checkout_request_id = db.Column(db.String(100), nullable=True, unique=True, index=True)
+    checkout_request_id = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     deleted_at = db.Column(db.DateTime, nullable=True)
     user = db.relationship("User", back_populates="orders")
@@ -0,0 +1,106 @@
+import os
+import time
+import base64
+import threading
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('app')
+
+class MpesaError(Exception):
+    """Raised when the M-Pesa API cannot be reached or returns an error."""
+
+class MpesaClient:
+    """Daraja API client with a shared keep-alive session and a cached OAuth token.
+
+    The access token is reused until shortly before it expires. When it needs
+    refreshing only one caller performs the OAuth request; concurrent callers
+    wait on the same lock and pick up the fresh token.
+    """
+
+    def __init__(self, base_url: str = None, consumer_key: str = None, consumer_secret: str = None,
+                 timeout: tuple = (3.05, 15), refresh_margin: float = 60.0, pool_size: int = 10):
+        self.base_url = (base_url or os.getenv("MPESA_BASE_URL", "https://sandbox.safaricom.co.ke")).rstrip("/")
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def _credentials(self):
+        consumer_key = self.consumer_key or os.getenv("MPESA_CONSUMER_KEY")
+        consumer_secret = self.consumer_secret or os.getenv("MPESA_CONSUMER_SECRET")
+        if not consumer_key or not consumer_secret:
+            logger.error("M-Pesa consumer key or secret is missing.")
+            raise MpesaError("M-Pesa consumer key or secret is missing.")
+        return base64.b64encode(f"{consumer_key}:{consumer_secret}".encode()).decode()
+
+    def _token_is_fresh(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_margin
+
+    def get_access_token(self) -> str:
+        """Return a valid access token, refreshing it at most once at a time."""
+        if self._token_is_fresh():
+            return self._token
+        with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._token_is_fresh():
+                return self._token
+            self._token, self._expires_at = self._fetch_token()
+            return self._token
+
+    def _fetch_token(self):
+        try:
+            response = self.session.get(
+                f"{self.base_url}/oauth/v1/generate",
+                params={"grant_type": "client_credentials"},
+                headers={"Authorization": f"Basic {self._credentials()}"},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to get M-Pesa access token: {str(e)}")
+            raise MpesaError("Failed to get M-Pesa access token")
+
+        access_token = data.get("access_token")
+        if not access_token:
+            logger.error("Access token not found in the response.")
+            raise MpesaError("Access token not found in the response.")
+        expires_in = float(data.get("expires_in", 3599))
+        logger.info(f"M-Pesa access token refreshed, expires in {expires_in:.0f}s")
+        return access_token, time.monotonic() + expires_in
+
+    def invalidate_token(self):
+        """Drop the cached token so the next call fetches a new one."""
+        with self._refresh_lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def stk_push(self, payload: dict) -> dict:
+        """Send an STK push request and return the decoded response."""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/mpesa/stkpush/v1/processrequest",
+                json=payload,
+                headers={"Authorization": f"Bearer {self.get_access_token()}"},
+                timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"STK Push request failed: {str(e)}")
+            raise MpesaError(f"Failed to initiate STK Push: {str(e)}")
+        if response.status_code == 401:
+            self.invalidate_token()
+        if response.status_code != 200:
+            raise MpesaError(f"Failed to initiate STK Push: {response.text}")
+        return response.json()
+
+mpesa_client = MpesaClient()
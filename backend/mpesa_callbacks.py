@@ -0,0 +1,87 @@
+import queue
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger('app')
+
+def parse_stk_callback(payload):
+    """Extract (checkout_request_id, result_code, result_desc) from a Daraja STK callback body."""
+    callback = (payload or {}).get("Body", {}).get("stkCallback", {})
+    checkout_request_id = callback.get("CheckoutRequestID")
+    if not checkout_request_id:
+        raise ValueError("Callback is missing CheckoutRequestID")
+    return checkout_request_id, int(callback.get("ResultCode", -1)), callback.get("ResultDesc", "")
+
+class CallbackProcessor:
+    """Queue M-Pesa callbacks and apply them in batches on a single worker thread.
+
+    Callbacks are deduplicated twice: a bounded memory of recently seen
+    checkout ids drops retries before they reach the database, and within a
+    batch only the first result per checkout id is kept. `apply_batch` receives
+    a {checkout_request_id: result_code} dict, is expected to update rows
+    idempotently, and returns the checkout ids that matched no pending order.
+    Those are forgotten again, so a retry of a callback that raced ahead of
+    the order's own commit is applied instead of dropped.
+    """
+
+    def __init__(self, apply_batch, batch_size: int = 200, seen_size: int = 10000, max_queue: int = 10000):
+        self.apply_batch = apply_batch
+        self.batch_size = batch_size
+        self.seen_size = seen_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._seen = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker thread if it is not already running."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mpesa-callbacks", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, checkout_request_id: str, result_code: int) -> bool:
+        """Queue a callback result. Returns False if it is a duplicate of a recent one.
+
+        Never blocks: raises queue.Full when the backlog is at `max_queue`, after
+        forgetting the id so a retry can be queued later.
+        """
+        with self._seen_lock:
+            if checkout_request_id in self._seen:
+                return False
+            self._seen[checkout_request_id] = True
+            if len(self._seen) > self.seen_size:
+                self._seen.popitem(last=False)
+        self.start()
+        try:
+            self._queue.put_nowait((checkout_request_id, result_code))
+        except queue.Full:
+            self._forget([checkout_request_id])
+            raise
+        return True
+
+    def _forget(self, checkout_request_ids):
+        with self._seen_lock:
+            for checkout_request_id in checkout_request_ids:
+                self._seen.pop(checkout_request_id, None)
+
+    def _run(self):
+        while True:
+            batch = {}
+            checkout_request_id, result_code = self._queue.get()
+            batch[checkout_request_id] = result_code
+            while len(batch) < self.batch_size:
+                try:
+                    checkout_request_id, result_code = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.setdefault(checkout_request_id, result_code)
+            try:
+                unmatched = self.apply_batch(batch) or ()
+            except Exception as e:
+                logger.error(f"Failed to apply {len(batch)} M-Pesa callbacks: {str(e)}")
+                # Let Safaricom's retries through again
+                unmatched = batch
+            self._forget(unmatched)
@@ -0,0 +1,96 @@
+import os
+import time
+import multiprocessing
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import bcrypt as _bcrypt
+
+logger = logging.getLogger('app')
+
+class HasherSaturated(Exception):
+    """Raised when too many hashing jobs are already queued."""
+
+def _hash_password(password: str, rounds: int) -> str:
+    """Hash a password with bcrypt (runs in a worker process)."""
+    return _bcrypt.hashpw(password.encode("utf-8"), _bcrypt.gensalt(rounds)).decode("utf-8")
+
+def _check_password(password_hash: str, password: str) -> bool:
+    """Check a password against a bcrypt hash (runs in a worker process)."""
+    return _bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt so hashing never runs on a request thread.
+
+    At most `max_pending` jobs may be queued or running at once; further calls
+    fail fast with HasherSaturated instead of piling up behind the pool. The
+    caller waits by polling with `sleep`, so under eventlet it must be a
+    cooperative sleep (socketio.sleep) or the whole event loop stalls.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None, timeout: float = 10.0, rounds: int = 12,
+                 sleep=time.sleep, poll_interval: float = 0.01):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self.rounds = rounds
+        self.sleep = sleep
+        self.poll_interval = poll_interval
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Create the process pool on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Workers are started lazily while other threads (job pools, the callback
+                # worker) may hold locks; forking then can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver")
+                )
+                logger.info(f"✅ Password hasher started with {self.workers} workers")
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Password hasher saturated, rejecting request")
+            raise HasherSaturated("Password hashing queue is full")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the job really finishes, even if the caller gives up waiting
+        future.add_done_callback(lambda f: self._slots.release())
+
+        deadline = time.monotonic() + self.timeout
+        while not future.done():
+            if time.monotonic() >= deadline:
+                raise TimeoutError("Password hashing timed out")
+            self.sleep(self.poll_interval)
+        return future.result()
+
+    def hash(self, password: str) -> str:
+        """Return a bcrypt hash of the password."""
+        return self._run(_hash_password, password, self.rounds)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """Return True if the password matches the bcrypt hash."""
+        return self._run(_check_password, password_hash, password)
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+password_hasher = PasswordHasher(
+    workers=int(os.getenv('HASHER_WORKERS', '0')) or None,
+    max_pending=int(os.getenv('HASHER_MAX_PENDING', '0')) or None,
+    timeout=float(os.getenv('HASHER_TIMEOUT', '10')),
+    rounds=int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+)
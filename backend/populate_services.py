@@ -1,125 +1,182 @@
 import os
 import json
-from models import db, Service
+import hashlib
+from datetime import datetime
+from sqlalchemy import or_
+from models import db, Service, CatalogSource, CatalogVersion, upsert_insert
+from catalog_cache import catalog_cache
 import logging
 
-# Configure logging
 logger = logging.getLogger('app')
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
-def load_services_from_file(file_path):
-    """Load services from a JSON file."""
-    try:
-        with open(file_path, "r", encoding='utf-8') as f:
-            services = json.load(f)
-        logger.info(f"✅ Successfully loaded services from {file_path}")
-        return services
-    except FileNotFoundError:
-        logger.error(f"❌ File not found: {file_path}")
-        raise
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Invalid JSON in file {file_path}: {str(e)}")
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error loading services from file: {str(e)}")
-        raise
-
-def validate_service_data(service_data):
-    """Validate service data before processing."""
-    required_fields = ["category", "name", "price"]
-    for field in required_fields:
-        if field not in service_data:
-            raise ValueError(f"Missing required field: {field}")
-    if not isinstance(service_data["name"], str) or not service_data["name"].strip():
-        raise ValueError("Service name must be a non-empty string")
-    if not isinstance(service_data["price"], (int, float)) or service_data["price"] < 0:
-        raise ValueError("Price must be a non-negative number")
-    return True
-
-def process_services(services_data, existing_services):
-    """Process services data and prepare for database operations."""
-    new_services = []
-    updated_services = []
-
-    for service_data in services_data:
-        try:
-            # Validate service data
-            validate_service_data(service_data)
-
-            # Create a Service object
-            service = Service(
-                category=service_data["category"],
-                name=service_data["name"],
-                price=service_data["price"],
-                currency=service_data.get("currency", "KES"),
-                description=service_data.get("description", ""),
-                is_active=service_data.get("is_active", True)
-            )
-
-            # Check if the service already exists
-            existing = existing_services.get(service_data["name"])
-            if not existing:
-                new_services.append(service)
-                logger.info(f"✅ New service added: {service_data['name']}")
-            else:
-                # Update existing service if there are changes
-                if (
-                    existing.category != service_data["category"] or
-                    existing.price != service_data["price"] or
-                    existing.currency != service_data.get("currency", "KES") or
-                    existing.description != service_data.get("description", "") or
-                    existing.is_active != service_data.get("is_active", True)
-                ):
-                    existing.category = service_data["category"]
-                    existing.price = service_data["price"]
-                    existing.currency = service_data.get("currency", "KES")
-                    existing.description = service_data.get("description", "")
-                    existing.is_active = service_data.get("is_active", True)
-                    updated_services.append(existing)
-                    logger.info(f"✅ Service updated: {service_data['name']}")
-
-        except ValueError as e:
-            logger.warning(f"❌ Invalid service data: {service_data}. Error: {str(e)}")
-        except Exception as e:
-            logger.error(f"❌ Unexpected error processing service data: {service_data}. Error: {str(e)}")
-
-    return new_services, updated_services
 
-def populate_services(app):
-    """Populate the Service table with predefined services from a JSON file."""
+# Rows per INSERT ... ON CONFLICT statement; 6 bound columns each keeps a chunk
+# under SQLite's historical 999-variable limit.
+UPSERT_CHUNK_SIZE = int(os.getenv('SERVICES_UPSERT_CHUNK', '150'))
+
+def file_sha256(file_path, chunk_size=65536):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def iter_json_array(file_obj, chunk_size=65536):
+    """Yield the elements of a top-level JSON array without loading the whole file.
+
+    Elements are decoded one at a time from a sliding buffer, so memory use is
+    bounded by the largest single element rather than by the file size.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    expect = "["
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = file_obj.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        if expect == "[":
+            if buffer[0] != "[":
+                raise ValueError("Expected a JSON array")
+            buffer, expect = buffer[1:], "first"
+            continue
+        if buffer[0] == "]" and expect in ("first", ","):
+            return
+        if expect == ",":
+            if buffer[0] != ",":
+                raise ValueError("Expected ',' between array elements")
+            buffer, expect = buffer[1:], "item"
+            continue
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file_obj.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield item
+        buffer, expect = buffer[end:], ","
+
+def upsert_services(rows):
+    """Insert or update services by name in one statement; returns the number of rows changed.
+
+    Rows that already match the stored service are left untouched and not counted.
+    """
+    # A statement may not touch the same row twice; the last entry for a name wins
+    rows = list({row["name"]: row for row in rows}.values())
+    stmt = upsert_insert(Service).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={
+            "category": excluded.category,
+            "price": excluded.price,
+            "currency": excluded.currency,
+            "description": excluded.description,
+            "is_active": excluded.is_active
+        },
+        where=or_(
+            Service.category != excluded.category,
+            Service.price != excluded.price,
+            Service.currency != excluded.currency,
+            Service.description != excluded.description,
+            Service.is_active != excluded.is_active
+        )
+    )
+    return db.session.execute(stmt).rowcount
+
+def iter_valid_services(file_path, batch_size=UPSERT_CHUNK_SIZE):
+    """Stream validated service rows from a JSON catalog file, logging and skipping invalid entries.
+
+    Records are checked in batches with catalog_import.validate_catalog_rows,
+    the same validator used for uploaded catalogs.
+    """
+    from catalog_import import validate_catalog_rows
+
+    def validated(records, first_row):
+        rows, errors = validate_catalog_rows(records)
+        for error in errors:
+            record = records[error["row"] - 1]
+            logger.warning(f"❌ Invalid service data at entry {first_row + error['row']}: {record}. Error: {'; '.join(error['errors'])}")
+        return rows
+
+    with open(file_path, "r", encoding='utf-8') as f:
+        batch = []
+        seen = 0
+        for service_data in iter_json_array(f):
+            batch.append(service_data)
+            if len(batch) >= batch_size:
+                yield from validated(batch, seen)
+                seen += len(batch)
+                batch = []
+        if batch:
+            yield from validated(batch, seen)
+
+def build_catalog_snapshot():
+    """Group every active service by category and store it in the catalog cache."""
+    categories = {}
+    for service in Service.query_active().order_by(Service.category.asc(), Service.name.asc()):
+        categories.setdefault(service.category, []).append({
+            "id": service.id,
+            "name": service.name,
+            "price": float(service.price),
+            "currency": service.currency,
+            "description": service.description
+        })
+    return catalog_cache.set_snapshot(categories)
+
+def populate_services(app, force=False):
+    """Sync the Service table with services.json.
+
+    The run is skipped when the file's content hash matches the one recorded
+    by the last successful sync (unless `force` is set). Otherwise the file is
+    stream-parsed and applied in chunked upserts, and the new hash is stored
+    in the same transaction.
+    """
     file_path = os.path.join(os.path.dirname(__file__), "services.json")
     if not os.path.exists(file_path):
         logger.error(f"❌ File not found: {file_path}")
         return
 
-    # Load services data from the JSON file
-    services_data = load_services_from_file(file_path)
+    source = os.path.basename(file_path)
+    content_hash = file_sha256(file_path)
 
     with app.app_context():
         try:
-            # Ensure the database tables are created
-            db.create_all()
-
-            # Fetch existing services for comparison
-            existing_services = {service.name: service for service in Service.query.all()}
-
-            # Process services data
-            new_services, updated_services = process_services(services_data, existing_services)
-
-            # Add new services to the database
-            if new_services:
-                db.session.bulk_save_objects(new_services)
-                logger.info(f"✅ {len(new_services)} new services added successfully!")
-
-            # Update existing services in the database
-            if updated_services:
-                db.session.add_all(updated_services)
-                logger.info(f"✅ {len(updated_services)} services updated successfully!")
+            state = db.session.get(CatalogSource, source)
+            if state and state.content_hash == content_hash and not force:
+                logger.info(f"✅ {source} unchanged since last sync; skipping")
+                return
+
+            changed = 0
+            chunk = []
+            for row in iter_valid_services(file_path):
+                chunk.append(row)
+                if len(chunk) >= UPSERT_CHUNK_SIZE:
+                    changed += upsert_services(chunk)
+                    chunk = []
+            if chunk:
+                changed += upsert_services(chunk)
+
+            db.session.merge(CatalogSource(source=source, content_hash=content_hash, synced_at=datetime.utcnow()))
+            if changed:
+                CatalogVersion.bump()
 
             # Commit the transaction
             db.session.commit()
 
-            if not new_services and not updated_services:
+            if changed:
+                logger.info(f"✅ {changed} services added or updated from {source}")
+                # Cached catalog responses in this process no longer match the database
+                catalog_cache.invalidate()
+            else:
                 logger.info("✅ No new or updated services to process. Database is up to date.")
 
         except Exception as e:
@@ -132,6 +189,8 @@ def populate_services(app):
             db.session.close()
 
 if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     from app import create_app
     app = create_app()
-    populate_services(app)
\ No newline at end of file
+    populate_services(app)
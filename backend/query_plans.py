@@ -0,0 +1,105 @@
+import re
+import json
+import base64
+import logging
+from datetime import datetime
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from models import db, User
+
+logger = logging.getLogger('app')
+
+# (path, role of the token used to call it, whether it must seek) for every hot
+# read route. Routes with a cursor or a filter predicate must SEARCH an index;
+# the others may walk one from the start under a LIMIT.
+HOT_ROUTES = [
+    ("/api/services", "user", False),
+    ("/api/services/cleaning", "user", True),
+    ("/api/cart", "user", True),
+    ("/api/cart/summary", "user", True),
+    ("/api/orders/my", "user", True),
+    ("/api/orders/my?cursor=", "user", True),
+    ("/api/orders/my?cursor={cursor}&include_total=true", "user", True),
+    ("/api/orders", "admin", False),
+    ("/api/orders?cursor=", "admin", False),
+    ("/api/orders?cursor={cursor}&include_total=true", "admin", True),
+]
+
+# "SCAN order", "SCAN TABLE order" (older SQLite) or "SCAN order USING [COVERING] INDEX ..."
+_SCAN = re.compile(r"^SCAN (TABLE )?(?P<table>[^\s(]\S*)(?P<index>.*)$")
+
+# A COUNT over all matching rows has to visit each of them; it is held to the
+# no-table-scan rule but not to the seek rule
+_COUNT = re.compile(r"^\s*SELECT count\(", re.IGNORECASE)
+
+# Exempt: a COUNT of every live row (the admin order total) reads the whole
+# table whichever access path SQLite picks
+_LIVE_ROW_COUNT = re.compile(
+    r'^\s*SELECT count\([^)]*\) AS \w+\s+FROM "?\w+"?\s+WHERE "?\w+"?\.deleted_at IS NULL\s*$',
+    re.IGNORECASE
+)
+
+def plan_problems(details, seek=False):
+    """Return the plan steps that read a whole table, sort into a temp B-tree or (with seek) walk a whole index."""
+    problems = []
+    for detail in details:
+        match = _SCAN.match(detail)
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif match and match.group("table") != "CONSTANT" and (seek or not match.group("index")):
+            problems.append(detail)
+    return problems
+
+def capture_selects(app, path, token):
+    """Call a route through the test client and return the (statement, parameters) of every SELECT it ran."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = app.test_client().get(path, headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)}")
+    return statements
+
+def explain(statement, parameters):
+    """Return the detail column of SQLite's EXPLAIN QUERY PLAN for a statement."""
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
+
+def check_route_plans(app):
+    """Explain the SQL behind every hot route; returns a list of problems (empty when all plans are indexed).
+
+    Needs a SQLite database with the schema and at least one active user
+    (`flask migrate && flask seed`). Plans depend on table statistics, so run
+    it against realistic data after ANALYZE.
+    """
+    if db.engine.dialect.name != "sqlite":
+        raise RuntimeError("Query plan checks use SQLite's EXPLAIN QUERY PLAN")
+    user = User.query_active().order_by(User.id).first()
+    if not user:
+        raise RuntimeError("No active user to call the routes as; run `flask seed` first")
+
+    tokens = {
+        role: create_access_token(identity=str(user.id), additional_claims={"role": role})
+        for role in ("user", "admin")
+    }
+    cursor = base64.urlsafe_b64encode(json.dumps([datetime.utcnow().isoformat(), 2 ** 31]).encode()).decode()
+
+    problems = []
+    for path, role, seek in HOT_ROUTES:
+        path = path.format(cursor=cursor)
+        for statement, parameters in capture_selects(app, path, tokens[role]):
+            if _LIVE_ROW_COUNT.match(statement):
+                continue
+            details = explain(statement, parameters)
+            for detail in plan_problems(details, seek=seek and not _COUNT.match(statement)):
+                problems.append({"route": path, "statement": statement, "step": detail, "plan": details})
+        logger.info(f"Checked query plans for {path}")
+    return problems
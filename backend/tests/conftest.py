@@ -0,0 +1,25 @@
+import os
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """The Flask app on a fresh SQLite file with the schema migrated and X-Query-Count enabled."""
+    db_path = tmp_path_factory.mktemp("db") / "test.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["QUERY_COUNT_HEADER"] = "true"
+    os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+
+    from app import app as flask_app
+    from cli import migrate_database
+
+    with flask_app.app_context():
+        migrate_database()
+    return flask_app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,13 @@
+from catalog_import import validate_catalog_rows
+
+def test_non_finite_prices_are_rejected():
+    records = [
+        {"name": "Ok", "category": "food", "price": "12.5"},
+        {"name": "Nan", "category": "food", "price": "nan"},
+        {"name": "Inf", "category": "food", "price": "inf"},
+        {"name": "Negative inf", "category": "food", "price": float("-inf")},
+    ]
+    rows, errors = validate_catalog_rows(records)
+    assert [row["name"] for row in rows] == ["Ok"]
+    assert [error["name"] for error in errors] == ["Nan", "Inf", "Negative inf"]
+    assert all(error["errors"] == ["price must be a non-negative number"] for error in errors)
@@ -0,0 +1,56 @@
+import threading
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from models import db, User, Service, Cart
+
+@pytest.fixture
+def shopper(app):
+    """A user with two cart lines; returns (headers, [service ids])."""
+    with app.app_context():
+        user = User(username="checkout-user", password_hash="x")
+        services = [Service(category="cleaning", name=f"Checkout Service {i}", price=20 + i) for i in range(3)]
+        db.session.add_all([user, *services])
+        db.session.flush()
+        db.session.add_all(Cart(user_id=user.id, service_id=service.id, quantity=1, location="Home") for service in services[:2])
+        db.session.commit()
+        token = create_access_token(identity=str(user.id), additional_claims={"role": "user"})
+        return {"Authorization": f"Bearer {token}"}, [service.id for service in services]
+
+def test_async_checkout_keeps_new_lines_and_rejects_a_second_checkout(client, shopper, monkeypatch):
+    from mpesa import mpesa_client
+
+    headers, service_ids = shopper
+    release = threading.Event()
+    pushes = []
+
+    def stk_push(payload):
+        pushes.append(payload)
+        release.wait(5)
+        return {"CheckoutRequestID": "ws_CO_checkout_test", "ResponseCode": "0"}
+
+    monkeypatch.setattr(mpesa_client, "stk_push", stk_push)
+
+    response = client.post("/api/mpesa/payment?async=true", json={"phone_number": "254700000000"}, headers=headers)
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    # A second tap while the first job is pending does not price or push again
+    for path in ("/api/mpesa/payment?async=true", "/api/mpesa/payment"):
+        response = client.post(path, json={"phone_number": "254700000000"}, headers=headers)
+        assert response.status_code == 409
+        assert response.get_json()["job_id"] == job_id
+
+    # A line added after the 202 was never charged and must survive the job
+    response = client.post("/api/cart", json={"service_id": service_ids[2], "quantity": 1, "location": "Home"}, headers=headers)
+    assert response.status_code == 201
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while client.get(f"/api/mpesa/payment/{job_id}", headers=headers).get_json()["status"] == "pending":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    assert len(pushes) == 1
+    cart = client.get("/api/cart", headers=headers).get_json()["cart"]
+    assert [item["service_id"] for item in cart] == [service_ids[2]]
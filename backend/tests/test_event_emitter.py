@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from models import db, User, Service, Order, OrderStatus
+
+def wait_for(socketio, client, event, timeout=3.0):
+    """Yield to the event loop until `event` reaches the client; returns its payloads."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        socketio.sleep(0.05)
+        payloads = [packet["args"][0] for packet in client.get_received() if packet["name"] == event]
+        if payloads:
+            return payloads
+    return []
+
+@pytest.fixture
+def admin_socket(app):
+    from app import socketio, events
+
+    with app.app_context():
+        admin = User.query.filter_by(username="events-admin").first()
+        if admin is None:
+            admin = User(username="events-admin", password="secret", role="admin")
+            db.session.add(admin)
+            db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={"role": "admin"})
+    client = socketio.test_client(app, auth={"token": token})
+    events.flush()  # Leave out anything earlier tests queued
+    client.get_received()
+    yield client
+    client.disconnect()
+
+def test_emit_from_worker_thread_is_delivered(app, admin_socket):
+    from app import socketio, events, ADMIN_ROOM
+
+    for attempt in range(2):
+        # A second emit after the first must still be delivered
+        worker = threading.Thread(target=events.emit, args=("order_updated", f"order:{attempt}", {"id": attempt}, ADMIN_ROOM))
+        worker.start()
+        worker.join()
+        assert wait_for(socketio, admin_socket, "order_updated") == [{"updates": [{"id": attempt}]}]
+
+def test_mpesa_callback_update_reaches_admins(app, client, admin_socket):
+    from app import socketio
+
+    with app.app_context():
+        user = User(username="events-user", password="secret")
+        service = Service(category="cleaning", name="Events Service", price=50)
+        db.session.add_all([user, service])
+        db.session.flush()
+        order = Order(user_id=user.id, service_id=service.id, quantity=1, location="Here", total_price=50,
+                      status=OrderStatus.PROCESSING, checkout_request_id="ws_CO_events")
+        db.session.add(order)
+        db.session.commit()
+
+    response = client.post("/api/mpesa/callback", json={
+        "Body": {"stkCallback": {"CheckoutRequestID": "ws_CO_events", "ResultCode": 0, "ResultDesc": "OK"}}
+    })
+    assert response.status_code == 200
+
+    payloads = wait_for(socketio, admin_socket, "order_updated")
+    assert payloads and payloads[0]["updates"][0]["status"] == OrderStatus.PAID.value
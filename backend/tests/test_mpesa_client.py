@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from mpesa import MpesaClient, MpesaError
+
+class DarajaStub(BaseHTTPRequestHandler):
+    """Local stand-in for the Daraja OAuth and STK push endpoints."""
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        stub = self.server
+        if not self.path.startswith("/oauth/v1/generate"):
+            return self._reply(404, {})
+        with stub.lock:
+            stub.token_requests += 1
+            token = f"token-{stub.token_requests}"
+        time.sleep(0.1)  # Give concurrent callers time to pile up behind the refresh
+        self._reply(200, {"access_token": token, "expires_in": "3599"})
+
+    def do_POST(self):
+        stub = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with stub.lock:
+            stub.push_tokens.append(self.headers.get("Authorization"))
+            reject = stub.reject_next
+            stub.reject_next = False
+        if reject:
+            return self._reply(401, {"errorMessage": "Invalid Access Token"})
+        self._reply(200, {"CheckoutRequestID": "ws_CO_stub", "ResponseCode": "0"})
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def daraja(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DarajaStub)
+    server.lock = threading.Lock()
+    server.token_requests = 0
+    server.push_tokens = []
+    server.reject_next = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("MPESA_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def mpesa(daraja):
+    client = MpesaClient(consumer_key="key", consumer_secret="secret")
+    yield client
+    client.session.close()
+
+def test_token_is_reused(daraja, mpesa):
+    for _ in range(3):
+        assert mpesa.stk_push({"Amount": 1})["CheckoutRequestID"] == "ws_CO_stub"
+    assert daraja.token_requests == 1
+    assert daraja.push_tokens == ["Bearer token-1"] * 3
+
+def test_concurrent_callers_share_one_refresh(daraja, mpesa):
+    barrier = threading.Barrier(8)
+    tokens = []
+
+    def call():
+        barrier.wait()
+        tokens.append(mpesa.get_access_token())
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert daraja.token_requests == 1
+    assert tokens == ["token-1"] * 8
+
+def test_401_invalidates_the_token(daraja, mpesa):
+    mpesa.stk_push({"Amount": 1})
+    daraja.reject_next = True
+    with pytest.raises(MpesaError):
+        mpesa.stk_push({"Amount": 1})
+    mpesa.stk_push({"Amount": 1})
+
+    assert daraja.token_requests == 2
+    assert daraja.push_tokens == ["Bearer token-1", "Bearer token-1", "Bearer token-2"]
@@ -0,0 +1,19 @@
+from flask_jwt_extended import create_access_token
+from models import db, User
+from password_hasher import password_hasher
+
+def test_reset_password_requires_a_token_and_rehashes(app, client):
+    with app.app_context():
+        user = User(username="reset-user", password_hash=password_hasher.hash("old-secret"))
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id), additional_claims={"role": "user"})
+
+    body = {"token": "emailed-token", "new_password": "new-secret"}
+    assert client.post("/api/reset-password", json=body).status_code == 401
+
+    response = client.post("/api/reset-password", json=body, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+    assert client.post("/api/login", json={"username": "reset-user", "password": "old-secret"}).status_code == 401
+    assert client.post("/api/login", json={"username": "reset-user", "password": "new-secret"}).status_code == 200
@@ -0,0 +1,51 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from models import db, User, Service, Order, OrderStatus
+
+ORDERS_PER_USER = 60
+
+@pytest.fixture(scope="module")
+def tokens(app):
+    """Two users with ORDERS_PER_USER orders each; returns Authorization headers by role."""
+    with app.app_context():
+        admin = User(username="qc-admin", password="secret", role="admin")
+        customer = User(username="qc-user", password="secret")
+        services = [Service(category="cleaning", name=f"QC Service {i}", price=100 + i) for i in range(3)]
+        db.session.add_all([admin, customer, *services])
+        db.session.flush()
+        for user in (admin, customer):
+            for i in range(ORDERS_PER_USER):
+                service = services[i % len(services)]
+                db.session.add(Order(
+                    user_id=user.id,
+                    service_id=service.id,
+                    quantity=1 + i % 2,
+                    location=f"Block {i}",
+                    total_price=service.price,
+                    status=OrderStatus.PENDING
+                ))
+        db.session.commit()
+        return {
+            role: {"Authorization": f"Bearer {create_access_token(identity=str(user.id), additional_claims={'role': role})}"}
+            for role, user in (("admin", admin), ("user", customer))
+        }
+
+def query_count(client, path, headers):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return int(response.headers["X-Query-Count"])
+
+@pytest.mark.parametrize("path, role", [
+    ("/api/orders", "admin"),
+    ("/api/orders/my", "user"),
+])
+@pytest.mark.parametrize("mode", ["", "&cursor="])
+def test_order_listing_query_count_does_not_grow_with_page_size(client, tokens, path, role, mode):
+    headers = tokens[role]
+    # Warm the user existence cache so both measured requests take the same path
+    query_count(client, f"{path}?per_page=1{mode}", headers)
+
+    small = query_count(client, f"{path}?per_page=5{mode}", headers)
+    large = query_count(client, f"{path}?per_page=50{mode}", headers)
+
+    assert small == large
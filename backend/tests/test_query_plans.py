@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+import pytest
+from models import db, User, Service, Order, Cart, OrderStatus
+from query_plans import check_route_plans, plan_problems
+
+CATEGORIES = ["cleaning", "food", "groceries", "fruits", "gardening"]
+
+@pytest.fixture(scope="module")
+def seeded(app):
+    """Realistic volumes: 20 users with 200 orders and a few cart lines each, 250 services, then ANALYZE."""
+    with app.app_context():
+        users = [User(username=f"plan-user-{i}", password_hash="x") for i in range(20)]
+        services = [Service(category=CATEGORIES[i % len(CATEGORIES)], name=f"Plan Service {i}", price=10 + i) for i in range(250)]
+        db.session.add_all(users + services)
+        db.session.flush()
+        start = datetime.utcnow() - timedelta(days=200)
+        statuses = list(OrderStatus)
+        db.session.execute(db.insert(Order), [
+            {
+                "user_id": user.id,
+                "service_id": services[(u * 200 + i) % len(services)].id,
+                "quantity": 1,
+                "location": "Plan",
+                "total_price": 10.0,
+                "status": statuses[i % len(statuses)],
+                "checkout_request_id": f"ws_CO_plan_{u}_{i // 3}",
+                "created_at": start + timedelta(minutes=u * 200 + i),
+                "deleted_at": start if i % 50 == 0 else None,
+            }
+            for u, user in enumerate(users) for i in range(200)
+        ])
+        for u, user in enumerate(users):
+            db.session.add_all(Cart(user_id=user.id, service_id=services[u + k].id, quantity=1, location="Plan") for k in range(3))
+        db.session.commit()
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+
+def test_hot_routes_use_indexes(app, seeded):
+    with app.app_context():
+        assert check_route_plans(app) == []
+
+@pytest.mark.parametrize("details, seek, expected", [
+    (["SCAN order"], False, ["SCAN order"]),
+    (["SCAN order USING INDEX ix_order_active_created_at_id"], False, []),
+    (["SCAN order USING INDEX ix_order_active_created_at_id"], True, ["SCAN order USING INDEX ix_order_active_created_at_id"]),
+    (["SCAN order USING COVERING INDEX ix_order_user_id"], True, ["SCAN order USING COVERING INDEX ix_order_user_id"]),
+    (["SEARCH order USING INDEX ix_order_active_created_at_id (created_at<?)"], True, []),
+    (["SCAN CONSTANT ROW", "SCAN (subquery-2)"], True, []),
+    (["SEARCH cart USING INDEX ix_cart_user_id (user_id=?)", "USE TEMP B-TREE FOR ORDER BY"], False, ["USE TEMP B-TREE FOR ORDER BY"]),
+])
+def test_plan_problems(details, seek, expected):
+    assert plan_problems(details, seek=seek) == expected
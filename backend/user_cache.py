@@ -0,0 +1,39 @@
+import os
+import time
+import threading
+
+class UserExistenceCache:
+    """In-process TTL cache of whether a user id still belongs to an active user.
+
+    Invalidation is local to this process, so other workers may keep a stale
+    answer for at most `ttl` seconds after a user is deleted.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def exists(self, user_id: int, loader) -> bool:
+        """Return the cached answer for user_id, calling loader() on a miss or expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > now:
+                return entry[0]
+        exists = bool(loader())
+        with self._lock:
+            self._entries[user_id] = (exists, now + self.ttl)
+        return exists
+
+    def invalidate(self, user_id: int):
+        """Forget the cached answer for user_id."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Forget all cached answers."""
+        with self._lock:
+            self._entries.clear()
+
+user_existence_cache = UserExistenceCache(ttl=float(os.getenv('USER_CACHE_TTL', '60')))
@@ -0,0 +1,98 @@
+"""Cold-start time to first frame and peak RSS of the Kivy client.
+
+Each run starts a fresh interpreter that loads the given main.py as a module,
+runs its ServiceApp and stops it as soon as the window presents its first
+frame (the first Window.on_flip). The child reports the time from its own
+start to that flip, its peak RSS at that point and, where the client records
+them, the import and build() timings. Several clients can be compared in one
+call, so a revision from before a change can be measured next to the current
+one:
+
+    git show <rev>:main.py > /tmp/main_before.py
+    python benchmarks/bench_startup.py main.py /tmp/main_before.py --repeat 10
+
+To measure lazy screen construction (LazyScreenManager and the shared
+CategoryScreen), use the client from before that change as <rev>, i.e. the
+parent of the commit that added LazyScreenManager. The old client does not
+record import and build() timings, so only first_frame and rss_mb are
+compared for it.
+
+Without a display, pass --headless. It sets SDL_VIDEODRIVER=dummy and
+KIVY_GL_BACKEND=mock, so no window or GL context is created and the first
+frame measures the Python side of startup only. Under xvfb-run the real GL
+backend is used instead. Peak RSS comes from getrusage and is only reported
+on Linux and Android.
+"""
+import time
+_CHILD_T0 = time.perf_counter()
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+def run_child(path):
+    """Start the client at `path` and print its startup figures as one JSON line."""
+    os.chdir(os.path.dirname(os.path.abspath(path)))
+    spec = importlib.util.spec_from_file_location("main", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["main"] = module
+    spec.loader.exec_module(module)
+    app = module.ServiceApp()
+
+    def on_flip(window):
+        window.unbind(on_flip=on_flip)
+        result = {"first_frame": (time.perf_counter() - _CHILD_T0) * 1000}
+        for name, seconds in getattr(app, "_startup_timings", {}).items():
+            result.setdefault(name, seconds * 1000)
+        if sys.platform.startswith("linux"):
+            import resource
+            result["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print("STARTUP " + json.dumps(result), flush=True)
+        app.stop()
+
+    def on_start(*args):
+        from kivy.core.window import Window
+        Window.bind(on_flip=on_flip)
+
+    app.bind(on_start=on_start)
+    app.run()
+
+def measure(path, headless):
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    if headless:
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+        env.setdefault("KIVY_GL_BACKEND", "mock")
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path],
+                            env=env, capture_output=True, text=True, timeout=120)
+    for line in output.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            return json.loads(line[len("STARTUP "):])
+    raise RuntimeError(f"{path} did not reach its first frame:\n{output.stderr[-2000:]}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clients", nargs="*", default=["main.py"], help="main.py files to compare")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--headless", action="store_true", help="use the SDL dummy driver and mock GL")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    columns = ["first_frame", "import", "build", "rss_mb"]
+    print(f"{'client':<30} " + " ".join(f"{name:>12}" for name in columns))
+    for path in args.clients:
+        runs = [measure(path, args.headless) for _ in range(args.repeat)]
+        medians = [statistics.median(run[name] for run in runs) if all(name in run for run in runs) else None
+                   for name in columns]
+        print(f"{path:<30} " + " ".join(f"{value:>12.1f}" if value is not None else f"{'-':>12}"
+                                        for value in medians))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
-import React, { useState, useEffect, useCallback } from "react";
-import io from "socket.io-client";
+import React, { useState, useEffect, useCallback, useRef } from "react";
+import { createSocket, eventUpdates, applyOrderUpdates, applyCartUpdates } from "./realtime";
 
 const SOCKET_URL = "http://192.168.213.152:5000"; // WebSocket server URL
-const socket = io(SOCKET_URL, {
+const socket = createSocket(SOCKET_URL, {
   reconnection: true,
   reconnectionAttempts: 5,
   reconnectionDelay: 1000,
@@ -11,6 +11,7 @@ const socket = io(SOCKET_URL, {
 const AdminDashboard = ({ fetchProtectedData, logoutUser }) => {
   const [orders, setOrders] = useState([]);
   const [cartItems, setCartItems] = useState([]);
+  const cartItemsRef = useRef(cartItems); // Latest cart for merging socket deltas
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [currentPage, setCurrentPage] = useState(1);
@@ -157,18 +158,21 @@ const AdminDashboard = ({ fetchProtectedData, logoutUser }) => {
   useEffect(() => {
     fetchOrders(currentPage);
     fetchCartItems();
+    socket.connect();
 
-    socket.on("order_updated", (updatedOrder) => {
-      setOrders((prevOrders) =>
-        prevOrders.map((order) =>
-          order.order_id === updatedOrder.order_id ? updatedOrder : order
-        )
-      );
+    // Events arrive in batches: {"updates": [delta, ...]}
+    socket.on("order_updated", (payload) => {
+      setOrders((prevOrders) => applyOrderUpdates(prevOrders, eventUpdates(payload)));
     });
 
-    socket.on("cart_updated", (updatedCart) => {
-      console.log("Cart updated via WebSocket:", updatedCart); // Debugging: Log the WebSocket event
-      setCartItems(updatedCart.cart || []); // Ensure the correct response structure
+    socket.on("cart_updated", (payload) => {
+      console.log("Cart updated via WebSocket:", payload); // Debugging: Log the WebSocket event
+      const { cart, stale } = applyCartUpdates(cartItemsRef.current, eventUpdates(payload));
+      cartItemsRef.current = cart;
+      setCartItems(cart);
+      if (stale) {
+        fetchCartItems();
+      }
     });
 
     socket.on("connect_error", (error) => {
@@ -177,12 +181,16 @@ const AdminDashboard = ({ fetchProtectedData, logoutUser }) => {
     });
 
     return () => {
+      socket.off("order_updated");
+      socket.off("cart_updated");
+      socket.off("connect_error");
       socket.disconnect();
     };
   }, [fetchOrders, fetchCartItems, currentPage]);
 
   // Debugging: Log cartItems whenever it changes
   useEffect(() => {
+    cartItemsRef.current = cartItems;
     console.log("Cart Items Updated:", cartItems);
   }, [cartItems]);
 
@@ -1,8 +1,8 @@
-import React, { useState, useEffect, useCallback, createContext } from "react";
+import React, { useState, useEffect, useCallback, useMemo, useRef, createContext } from "react";
 import { Routes, Route, Navigate, useNavigate } from "react-router-dom";
 import axios from "axios";
 import jwt_decode from "jwt-decode";
-import io from "socket.io-client";
+import { createSocket, eventUpdates, applyCartUpdates } from "./realtime";
 import Login from "./Login";
 import AdminDashboard from "./AdminDashboard";
 import UserDashboard from "./UserDashboard";
@@ -17,16 +17,21 @@ const App = () => {
   const [role, setRole] = useState(null);
   const [loading, setLoading] = useState(true);
   const [cartItems, setCartItems] = useState([]);
+  const cartItemsRef = useRef(cartItems); // Latest cart for merging socket deltas
   const [error, setError] = useState(null); // Error state for displaying messages
   const navigate = useNavigate();
 
-  // Initialize WebSocket
-  const socket = io(SOCKET_URL, {
-    reconnection: true,
-    reconnectionAttempts: 5,
-    reconnectionDelay: 1000,
-    transports: ["websocket"], // Force WebSocket transport
-  });
+  // Initialize WebSocket (once; it authenticates with the stored token when connected)
+  const socket = useMemo(
+    () =>
+      createSocket(SOCKET_URL, {
+        reconnection: true,
+        reconnectionAttempts: 5,
+        reconnectionDelay: 1000,
+        transports: ["websocket"], // Force WebSocket transport
+      }),
+    []
+  );
 
   // Logout Function
   const logoutUser = useCallback(() => {
@@ -180,14 +185,20 @@ const App = () => {
 
   // Listen for Real-Time Cart Updates
   useEffect(() => {
-    socket.on("cart_updated", (updatedCart) => {
-      console.log("Cart updated via WebSocket:", updatedCart);
-      setCartItems((prevCartItems) => {
-        if (JSON.stringify(prevCartItems) !== JSON.stringify(updatedCart.cart)) {
-          return updatedCart.cart || [];
-        }
-        return prevCartItems;
-      });
+    if (!role) {
+      return undefined; // The server only accepts authenticated sockets
+    }
+    socket.connect();
+
+    // Events arrive in batches: {"updates": [delta, ...]}
+    socket.on("cart_updated", (payload) => {
+      console.log("Cart updated via WebSocket:", payload);
+      const { cart, stale } = applyCartUpdates(cartItemsRef.current, eventUpdates(payload));
+      cartItemsRef.current = cart;
+      setCartItems(cart);
+      if (stale) {
+        fetchCartItems();
+      }
     });
 
     socket.on("connect_error", (error) => {
@@ -196,12 +207,15 @@ const App = () => {
     });
 
     return () => {
+      socket.off("cart_updated");
+      socket.off("connect_error");
       socket.disconnect();
     };
-  }, [socket]);
+  }, [socket, role, fetchCartItems]);
 
   // Debugging: Log cartItems whenever it changes
   useEffect(() => {
+    cartItemsRef.current = cartItems;
     console.log("Cart Items Updated:", cartItems);
   }, [cartItems]);
 
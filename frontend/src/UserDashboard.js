@@ -1,8 +1,8 @@
-import React, { useState, useEffect, useCallback } from "react";
-import io from "socket.io-client";
+import React, { useState, useEffect, useCallback, useRef } from "react";
+import { createSocket, eventUpdates, applyOrderUpdates, applyCartUpdates } from "./realtime";
 
 const SOCKET_URL = "http://192.168.213.152:5000"; // WebSocket server URL
-const socket = io(SOCKET_URL, {
+const socket = createSocket(SOCKET_URL, {
   reconnection: true,
   reconnectionAttempts: 5,
   reconnectionDelay: 1000,
@@ -14,6 +14,7 @@ const UserDashboard = ({ fetchProtectedData, logoutUser }) => {
   const [services, setServices] = useState([]);
   const [orders, setOrders] = useState([]);
   const [cartItems, setCartItems] = useState([]);
+  const cartItemsRef = useRef(cartItems); // Latest cart for merging socket deltas
   const [selectedCategory, setSelectedCategory] = useState("all");
   const [servicesPage, setServicesPage] = useState(1);
   const [ordersPage, setOrdersPage] = useState(1);
@@ -182,17 +183,21 @@ const UserDashboard = ({ fetchProtectedData, logoutUser }) => {
 
   // Listen for Real-Time Updates
   useEffect(() => {
-    socket.on("order_updated", (updatedOrder) => {
-      setOrders((prevOrders) =>
-        prevOrders.map((order) =>
-          order.order_id === updatedOrder.order_id ? updatedOrder : order
-        )
-      );
+    socket.connect();
+
+    // Events arrive in batches: {"updates": [delta, ...]}
+    socket.on("order_updated", (payload) => {
+      setOrders((prevOrders) => applyOrderUpdates(prevOrders, eventUpdates(payload)));
     });
 
-    socket.on("cart_updated", (updatedCart) => {
-      console.log("Cart updated via WebSocket:", updatedCart); // Debugging: Log the WebSocket event
-      setCartItems(updatedCart.cart || []); // Ensure the correct response structure is used
+    socket.on("cart_updated", (payload) => {
+      console.log("Cart updated via WebSocket:", payload); // Debugging: Log the WebSocket event
+      const { cart, stale } = applyCartUpdates(cartItemsRef.current, eventUpdates(payload));
+      cartItemsRef.current = cart;
+      setCartItems(cart);
+      if (stale) {
+        fetchCartItems();
+      }
     });
 
     socket.on("connect_error", (error) => {
@@ -201,12 +206,16 @@ const UserDashboard = ({ fetchProtectedData, logoutUser }) => {
     });
 
     return () => {
+      socket.off("order_updated");
+      socket.off("cart_updated");
+      socket.off("connect_error");
       socket.disconnect();
     };
-  }, []);
+  }, [fetchCartItems]);
 
   // Debugging: Log cartItems whenever it changes
   useEffect(() => {
+    cartItemsRef.current = cartItems;
     console.log("Cart Items Updated:", cartItems);
   }, [cartItems]);
 
@@ -0,0 +1,63 @@
+import io from "socket.io-client";
+
+// Create a Socket.IO client that authenticates with the stored JWT.
+// The server refuses connections without a token, and the token is read on
+// every (re)connect so a fresh login is picked up. Call socket.connect() once
+// the user is logged in.
+export const createSocket = (url, options = {}) =>
+  io(url, {
+    autoConnect: false,
+    ...options,
+    auth: (cb) => cb({ token: localStorage.getItem("access_token") }),
+  });
+
+// Events arrive as {"updates": [delta, ...]}; older servers sent one object.
+export const eventUpdates = (payload) => payload?.updates || (payload ? [payload] : []);
+
+const orderId = (order) => order.id ?? order.order_id;
+
+// Merge order deltas into a list. Deltas carry "id" for a single order or
+// "checkout_request_id" for every order of one checkout.
+export const applyOrderUpdates = (orders, updates) =>
+  orders.map((order) => {
+    let next = order;
+    updates.forEach(({ id, user_id, ...fields }) => {
+      const matches =
+        id !== undefined
+          ? orderId(next) === id
+          : fields.checkout_request_id && next.checkout_request_id === fields.checkout_request_id;
+      if (matches) {
+        next = { ...next, ...fields };
+      }
+    });
+    return next;
+  });
+
+// Merge cart deltas into the cart lines. Returns {cart, stale}; stale means a
+// delta could not be applied locally and the cart should be fetched again.
+export const applyCartUpdates = (cart, updates) => {
+  let stale = false;
+  let next = cart;
+  updates.forEach(({ op, ...fields }) => {
+    if (op === "removed") {
+      next = next.filter((item) => item.id !== fields.id);
+    } else if (op === "upsert") {
+      const existing = next.find((item) => item.id === fields.id);
+      if (existing) {
+        next = next.map((item) => (item.id === fields.id ? { ...item, ...fields } : item));
+      } else if (fields.service_name !== undefined) {
+        next = [...next, fields];
+      } else {
+        stale = true;
+      }
+    } else {
+      stale = true;
+    }
+  });
+  next = next.map((item) =>
+    item.price !== undefined && item.quantity !== undefined
+      ? { ...item, total_price: item.price * item.quantity }
+      : item
+  );
+  return { cart: next, stale };
+};
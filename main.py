@@ -1,3 +1,6 @@
+import time
+_STARTUP_T0 = time.perf_counter()  # Reference point for the startup timings logged by ServiceApp
+
 from kivy.config import Config
 from kivy.utils import platform  
 
@@ -10,38 +13,29 @@ from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.spinner import Spinner
 from kivy.uix.textinput import TextInput
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.popup import Popup
-from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
 from kivy.uix.image import Image
-from kivy.core.image import Image as CoreImage
 from kivy.network.urlrequest import UrlRequest  # For non-blocking HTTP requests
 from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle
-from kivy.resources import resource_add_path
 from kivy.logger import Logger as logger
 
-# Standard Python and third-party imports
+# Standard Python imports. socketio and jwt are imported where they are first
+# needed (connect_socketio, on_login_success) to keep them off the cold start path.
 import os
 import json
-import requests
-from requests import post, get
-import socketio
-from socketio import Client as SocketIOClient  # Correct
 import logging
 from functools import partial
-import jwt
-from jwt import decode
-from platform import platform as sys_platform  # Renamed to avoid conflict with kivy.utils.platform
-from functools import lru_cache
 import configparser
 import traceback
 from kivy.storage.jsonstore import JsonStore
 from threading import Thread
 
 
-# Conditional imports
-print("Starting imports")
 # Conditional imports
 try:
     if platform == "android":
@@ -59,26 +53,20 @@ except Exception as e:
     Permission = None
     app_storage_path = lambda: os.getcwd()
 
-print("Imports completed")
-
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger.info('App: Starting operation...')
 
 # Define the Flask server URL
 SERVER_URL = 'http://192.168.213.152:5000'
-sio = socketio.Client()
 
 # Logging function
 def log(message):
     try:
-        print(message)
         logger.info(message)  # Use logger.info for better integration with Kivy's logging system
     except Exception as e:
         logger.error(f"Logging failed: {str(e)}")
 
-log("Starting Kivy app")
-
 # Custom Screen Manager to store token and role
 class MyScreenManager(ScreenManager):
     def __init__(self, **kwargs):
@@ -93,7 +81,160 @@ class MyScreenManager(ScreenManager):
             traceback.print_exc()
             raise
 
-log("MyScreenManager class defined")
+
+
+class LazyScreenManager(ScreenManager):
+    """ScreenManager that builds each screen the first time it is navigated to."""
+
+    def __init__(self, **kwargs):
+        super(LazyScreenManager, self).__init__(**kwargs)
+        self._factories = {}
+
+    def register(self, name, factory):
+        """Register a callable that builds the screen called `name` on demand."""
+        self._factories[name] = factory
+
+    def get_screen(self, name):
+        factory = self._factories.pop(name, None)
+        if factory is not None:
+            self.add_widget(factory(name=name))
+            logger.info(f"Built screen on first use: {name}")
+        return super(LazyScreenManager, self).get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._factories or super(LazyScreenManager, self).has_screen(name)
+
+
+class OrderStore:
+    """Client-side cache of orders shared by every screen.
+
+    Screens load it from /api/orders responses and render from it; pushed
+    `order_updated` deltas are merged in place so a status change costs no
+    HTTP round trip. Deltas keyed by checkout_request_id update every order
+    of that checkout; a delta for an order or checkout the store has never
+    seen is reported as missing so the visible screen can refetch once.
+    """
+
+    def __init__(self):
+        self._orders = {}
+
+    def load(self, orders):
+        """Replace the store's contents with a fetched list of orders."""
+        self._orders = {order["id"]: dict(order) for order in orders if "id" in order}
+
+    def add(self, orders):
+        """Merge another page of fetched orders into the store."""
+        for order in orders:
+            if "id" in order:
+                self._orders[order["id"]] = dict(order)
+
+    def orders(self):
+        """Orders in display order (newest first)."""
+        return sorted(self._orders.values(), key=lambda o: (o.get("created_at") or "", o["id"]), reverse=True)
+
+    def apply_updates(self, updates):
+        """Merge deltas into the store. Returns (changed orders, whether any were unknown)."""
+        changed = []
+        missing = False
+        for delta in updates:
+            if "id" in delta:
+                targets = [self._orders[delta["id"]]] if delta["id"] in self._orders else []
+            elif delta.get("checkout_request_id"):
+                targets = [o for o in self._orders.values() if o.get("checkout_request_id") == delta["checkout_request_id"]]
+            else:
+                targets = []
+            if not targets:
+                missing = True
+                continue
+            fields = {k: v for k, v in delta.items() if k not in ("id", "user_id")}
+            for order in targets:
+                order.update(fields)
+                changed.append(order)
+        return changed, missing
+
+    def clear(self):
+        """Drop all cached orders (e.g. on logout)."""
+        self._orders = {}
+
+
+
+class CatalogCache:
+    """Whole service catalog persisted in a JsonStore and revalidated by version.
+
+    The catalog comes from a single /api/services request and is stamped with
+    a version the server also sends as its ETag. `fetch` answers from disk
+    straight away when it can, then (at most once per `revalidate_after`
+    seconds) sends one conditional request; a 304 means the version has not
+    changed and nothing is re-rendered. Concurrent fetches share one request.
+    Callbacks use UrlRequest's (req, result) signature with result shaped like
+    /api/services/<category>; req is None for answers served from disk.
+    """
+
+    def __init__(self, path, revalidate_after=300):
+        self.store = JsonStore(path)
+        self.revalidate_after = revalidate_after
+        self._waiting = None  # callbacks for the request in flight
+
+    def _entry(self):
+        return self.store.get("catalog") if self.store.exists("catalog") else None
+
+    def get(self, category):
+        """Return the cached response for a category, or None."""
+        entry = self._entry()
+        return {"services": entry["categories"].get(category, [])} if entry else None
+
+    def fetch(self, category, on_success, on_failure=None, on_error=None):
+        """Serve a category from disk and revalidate the whole catalog in the background."""
+        entry = self._entry()
+        if entry:
+            on_success(None, self.get(category))
+            if time.time() - entry.get("checked_at", 0) < self.revalidate_after:
+                return
+
+        callbacks = (category, on_success, on_failure, on_error, entry is not None)
+        if self._waiting is not None:
+            self._waiting.append(callbacks)
+            return
+        self._waiting = [callbacks]
+
+        app = App.get_running_app()
+        headers = {"Authorization": f"Bearer {app.token}"}
+        if entry and entry.get("version"):
+            headers["If-None-Match"] = f'"{entry["version"]}"'
+        UrlRequest(
+            url=f"{app.server_url}/api/services",
+            req_headers=headers,
+            on_success=self._on_catalog,
+            on_redirect=self._on_not_modified,
+            on_failure=partial(self._on_request_failed, 2),
+            on_error=partial(self._on_request_failed, 3)
+        )
+
+    def _on_catalog(self, req, result):
+        previous = self._entry()
+        self.store.put("catalog", version=result.get("version"), categories=result.get("categories", {}), checked_at=time.time())
+        changed = not previous or previous.get("version") != result.get("version")
+        waiting, self._waiting = self._waiting or [], None
+        for category, on_success, _, _, served_from_disk in waiting:
+            if changed or not served_from_disk:
+                on_success(req, self.get(category))
+
+    def _on_not_modified(self, req, result):
+        entry = self._entry()
+        if req.resp_status == 304 and entry:
+            self.store.put("catalog", version=entry.get("version"), categories=entry["categories"], checked_at=time.time())
+        self._waiting = None
+
+    def _on_request_failed(self, callback_index, req, result):
+        waiting, self._waiting = self._waiting or [], None
+        for callbacks in waiting:
+            callback = callbacks[callback_index]
+            # A stale catalog on screen beats an error message
+            if callbacks[4]:
+                logger.warning(f"Catalog revalidation failed: {result}")
+            elif callback:
+                callback(req, result)
+
 
 
 class LoginScreen(Screen):
@@ -216,6 +357,8 @@ class LoginScreen(Screen):
             self.message_label.color = (1, 0, 0, 1)
             return
         
+        import jwt
+
         try:
             # Decode the token to get the user role
             decoded = jwt.decode(token, options={"verify_signature": False})
@@ -225,6 +368,7 @@ class LoginScreen(Screen):
             app = App.get_running_app()
             app.token = token
             app.user_id = user_id
+            app.connect_socketio()  # Socket.IO connections are authenticated with the JWT
             
             logger.info(f"Login successful for user_id: {user_id}, role: {role}")
             self.message_label.text = "✅ Login successful!"
@@ -721,6 +865,8 @@ class DashboardScreen(Screen):
         scrollview_services = ScrollView(size_hint=(1, 0.4))
         scrollview_services.add_widget(self.services_list)
         self.layout.add_widget(scrollview_services)
+        # Rows currently shown per category, so a repeated callback replaces them
+        self.category_rows = {}
         
         # Cart section
         self.cart_label = Label(
@@ -768,14 +914,6 @@ class DashboardScreen(Screen):
         self.layout.add_widget(scrollview_orders)
         
         self.add_widget(self.layout)
-        
-        # Register Socket.IO handler using app-level connection
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self.handle_order_update)
-            logger.info("Initialized DashboardScreen with Socket.IO handler")
-        except AttributeError:
-            logger.error("Socket.IO not initialized in app. Real-time updates unavailable.")
 
     def on_enter(self):
         """Fetch services and orders when the screen is entered."""
@@ -800,30 +938,58 @@ class DashboardScreen(Screen):
         
         categories = ["cleaning", "food", "groceries", "fruits", "gardening"]
         self.services_list.clear_widgets()
+        self.category_rows = {}
         for category in categories:
-            UrlRequest(
-                url=f"{app.server_url}/api/services/{category}",
-                req_headers={"Authorization": f"Bearer {app.token}"},
+            app.catalog_cache.fetch(
+                category,
                 on_success=partial(self.on_fetch_services_success, category),
-                on_failure=self.on_fetch_services_failure,
-                on_error=self.on_fetch_services_error
+                on_failure=partial(self.on_fetch_services_failure, category),
+                on_error=partial(self.on_fetch_services_error, category)
             )
 
+    def clear_category_rows(self, category):
+        """Remove the rows previously shown for a category."""
+        for row in self.category_rows.pop(category, []):
+            self.services_list.remove_widget(row)
+
     def on_fetch_services_success(self, category, req, result):
-        """Handle successful services fetch."""
+        """Handle successful services fetch.
+
+        The catalog cache may call this twice for one fetch (cached copy, then
+        the revalidated one), so the category's rows are rebuilt, not appended.
+        """
         services = result.get("services", [])
         logger.info(f"Fetched services for {category}: {len(services)} items")
+        self.clear_category_rows(category)
         if not services:
-            self.display_message(self.services_list, f"No services available for {category}.")
+            row = Label(text=f"No services available for {category}.", color=(0.8, 0.2, 0.2, 1),
+                        size_hint_y=None, height=40)
+            self.services_list.add_widget(row)
+            self.category_rows[category] = [row]
             return
         
-        for service in services:
+        self.category_rows[category] = [
             self.add_service_to_list(service['name'], service['price'], service['id'])
+            for service in services
+        ]
         self.message_label.text = "✅ Services loaded."
         self.message_label.color = (0, 1, 0, 1)
 
+    def on_fetch_services_failure(self, category, req, result):
+        """Handle services fetch failure."""
+        error = result.get("error", f"Failed to fetch services (Status: {req.resp_status})")
+        logger.warning(f"Service fetch failed for {category}: {error}")
+        self.message_label.text = f"❌ Failed to load {category} services."
+        self.message_label.color = (1, 0, 0, 1)
+
+    def on_fetch_services_error(self, category, req, error):
+        """Handle services fetch error."""
+        logger.error(f"Error fetching services for {category}: {error}")
+        self.message_label.text = f"❌ Error loading {category} services."
+        self.message_label.color = (1, 0, 0, 1)
+
     def add_service_to_list(self, service_name, price, service_id):
-        """Add a service to the services list."""
+        """Add a service to the services list and return its row."""
         service_box = BoxLayout(orientation='horizontal', size_hint_y=None, height=40)
         service_box.add_widget(Label(text=f"{service_name}", size_hint=(0.4, 1)))
         service_box.add_widget(Label(text=f"KES {price}", size_hint=(0.3, 1)))
@@ -836,6 +1002,7 @@ class DashboardScreen(Screen):
         add_to_cart_button.bind(on_press=lambda x: self.add_to_cart(service_id, service_name, price))
         service_box.add_widget(add_to_cart_button)
         self.services_list.add_widget(service_box)
+        return service_box
 
     def add_to_cart(self, service_id, service_name, price):
         """Add a service to the cart."""
@@ -982,15 +1149,20 @@ class DashboardScreen(Screen):
         """Handle successful orders fetch."""
         orders = result if isinstance(result, list) else result.get("orders", [])
         logger.info(f"Fetched {len(orders)} orders")
+        App.get_running_app().order_store.load(orders)
+        self.render_orders()
+        self.message_label.text = "✅ Orders loaded."
+        self.message_label.color = (0, 1, 0, 1)
+
+    def render_orders(self):
+        """Render the orders list from the shared order store."""
+        orders = App.get_running_app().order_store.orders()
         self.orders_list.clear_widgets()
         if not orders:
             self.display_message(self.orders_list, "No orders placed yet.")
             return
-        
         for order in orders:
             self.add_order_to_list(order)
-        self.message_label.text = "✅ Orders loaded."
-        self.message_label.color = (0, 1, 0, 1)
 
     def add_order_to_list(self, order):
         """Add an order to the orders list."""
@@ -1001,19 +1173,21 @@ class DashboardScreen(Screen):
         order_box.add_widget(Label(text=f"{order.get('status', 'Pending')}", size_hint=(0.3, 1)))
         self.orders_list.add_widget(order_box)
 
-    def handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        logger.info(f"Received order update: {data}")
-        self.message_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
-        self.message_label.color = (0, 1, 0, 1)
-        Clock.schedule_once(lambda dt: self.fetch_orders(None), 0.5)
+    def handle_order_update(self, changed, missing):
+        """Apply pushed order updates from the shared store; refetch only for unseen orders."""
+        if missing:
+            self.fetch_orders(None)
+            return
+        if changed:
+            order = changed[-1]
+            self.message_label.text = f"🔄 Order {order.get('id')} updated: {order.get('status')}"
+            self.message_label.color = (0, 1, 0, 1)
+            self.render_orders()
 
     def logout_user(self, instance):
         """Log out the user."""
         logger.info("Logging out user")
-        app = App.get_running_app()
-        app.token = None
-        app.user_id = None
+        App.get_running_app().logout()
         self.manager.current = 'login'
 
     def display_message(self, widget, message):
@@ -1039,7 +1213,58 @@ class DashboardScreen(Screen):
         popup.open()
 
 
+class AdminOrderRow(RecycleDataViewBehavior, BoxLayout):
+    """Recycled row of the admin order list: order summary plus action buttons."""
+
+    def __init__(self, **kwargs):
+        super(AdminOrderRow, self).__init__(orientation='horizontal', size_hint_y=None, height=50, **kwargs)
+        self.order_id = None
+        self.dashboard = None
+        self.order_label = Label(size_hint=(0.6, 1))
+        confirm_order_button = Button(
+            text="Confirm Order",
+            size_hint=(0.2, 1),
+            background_color=(0, 1, 0, 1),
+            color=(1, 1, 1, 1))
+        confirm_order_button.bind(on_press=lambda instance: self.dashboard.confirm_order(self.order_id, instance))
+        confirm_payment_button = Button(
+            text="Confirm Payment",
+            size_hint=(0.2, 1),
+            background_color=(0.8, 0.8, 0, 1),
+            color=(1, 1, 1, 1))
+        confirm_payment_button.bind(on_press=lambda instance: self.dashboard.confirm_payment(self.order_id, instance))
+        self.add_widget(self.order_label)
+        self.add_widget(confirm_order_button)
+        self.add_widget(confirm_payment_button)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Rebind this row to another order instead of building new widgets."""
+        self.order_id = data['order_id']
+        self.order_label.text = data['text']
+        self.dashboard = rv.dashboard
+
+
+class AdminOrderList(RecycleView):
+    """RecycleView of orders that asks its dashboard for the next page near the bottom."""
+
+    def __init__(self, dashboard, **kwargs):
+        super(AdminOrderList, self).__init__(**kwargs)
+        self.dashboard = dashboard
+        self.viewclass = AdminOrderRow
+        layout = RecycleBoxLayout(orientation='vertical', default_size=(None, 50), default_size_hint=(1, None),
+                                  size_hint_y=None, spacing=10)
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        self.bind(scroll_y=self._on_scroll)
+
+    def _on_scroll(self, instance, scroll_y):
+        if scroll_y <= 0.05:
+            self.dashboard.fetch_next_page()
+
+
 class AdminDashboard(Screen):
+    PAGE_SIZE = 50
+
     def __init__(self, **kwargs):
         super(AdminDashboard, self).__init__(**kwargs)
         layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
@@ -1066,12 +1291,13 @@ class AdminDashboard(Screen):
         fetch_button.bind(on_press=self.fetch_orders)
         layout.add_widget(fetch_button)
         
-        # Orders list with scroll view
-        self.orders_list = GridLayout(cols=1, spacing=10, size_hint_y=None)
-        self.orders_list.bind(minimum_height=self.orders_list.setter('height'))
-        scrollview = ScrollView(size_hint=(1, 1))
-        scrollview.add_widget(self.orders_list)
-        layout.add_widget(scrollview)
+        # Orders list: recycled rows, next page loaded on scroll
+        self.orders_view = AdminOrderList(self, size_hint=(1, 1))
+        layout.add_widget(self.orders_view)
+        self.next_cursor = None
+        self.loading = False
+        # Only the latest page request's response is applied
+        self._page_request = None
         
         # Logout button
         logout_button = Button(
@@ -1087,23 +1313,16 @@ class AdminDashboard(Screen):
         self.add_widget(layout)
 
     def on_enter(self):
-        """Fetch orders and register Socket.IO handler when the screen is entered."""
+        """Fetch orders when the screen is entered."""
         app = App.get_running_app()
         self.message_label.text = f"Admin Dashboard - User ID: {app.user_id or 'Admin'}"
         logger.info("Entering AdminDashboard")
         
-        # Register Socket.IO handler
-        if hasattr(app, 'sio'):
-            app.sio.on("order_updated", self.handle_order_update)
-            logger.info("Socket.IO handler registered for order updates")
-        else:
-            logger.error("Socket.IO not initialized in app. Real-time updates unavailable.")
-        
         # Fetch orders
         Clock.schedule_once(lambda dt: self.fetch_orders(None), 0)
 
     def fetch_orders(self, instance):
-        """Fetch all orders from the backend."""
+        """Fetch the first page of orders from the backend."""
         app = App.get_running_app()
         if not app or not app.token:
             self.show_popup("Error", "You are not authorized. Please log in again.")
@@ -1114,25 +1333,54 @@ class AdminDashboard(Screen):
         self.message_label.text = "🔄 Fetching orders..."
         self.message_label.color = (0, 1, 0, 1)
         logger.info("Fetching all orders")
-        self.orders_list.clear_widgets()
-        UrlRequest(
-            url=f"{app.server_url}/api/orders",
+        self._request_page(None)
+
+    def fetch_next_page(self):
+        """Fetch the page after the last loaded one, if there is one."""
+        if self.next_cursor and not self.loading:
+            logger.info("Fetching next page of orders")
+            self._request_page(self.next_cursor)
+
+    def _request_page(self, cursor):
+        """Request a page of orders; a first-page request supersedes any page still in flight."""
+        app = App.get_running_app()
+        self.loading = True
+        self._page_request = UrlRequest(
+            url=f"{app.server_url}/api/orders?per_page={self.PAGE_SIZE}&cursor={cursor or ''}",
             req_headers={'Authorization': f'Bearer {app.token}'},
-            on_success=self.on_fetch_orders_success,
+            on_success=partial(self.on_fetch_orders_success, cursor is None),
             on_failure=self.on_fetch_orders_failure,
             on_error=self.on_fetch_orders_error
         )
 
-    def on_fetch_orders_success(self, req, result):
+    def _is_stale(self, req):
+        if req is not self._page_request:
+            logger.info("Ignoring response to a superseded orders request")
+            return True
+        self._page_request = None
+        self.loading = False
+        return False
+
+    def on_fetch_orders_success(self, first_page, req, result):
         """Handle successful orders fetch."""
+        if self._is_stale(req):
+            return
         orders = result.get("orders", [])
         logger.info(f"Fetched {len(orders)} orders")
-        self.display_orders(orders)
+        app = App.get_running_app()
+        if first_page:
+            app.order_store.load(orders)
+        else:
+            app.order_store.add(orders)
+        self.next_cursor = result.get("next_cursor")
+        self.display_orders(app.order_store.orders())
         self.message_label.text = "✅ Orders loaded."
         self.message_label.color = (0, 1, 0, 1)
 
     def on_fetch_orders_failure(self, req, result):
         """Handle orders fetch failure."""
+        if self._is_stale(req):
+            return
         error = result.get("error", f"Failed to fetch orders (Status: {req.resp_status})")
         logger.warning(f"Order fetch failed: {error}")
         self.display_message(f"❌ {error}")
@@ -1141,40 +1389,35 @@ class AdminDashboard(Screen):
 
     def on_fetch_orders_error(self, req, error):
         """Handle orders fetch error."""
+        if self._is_stale(req):
+            return
         logger.error(f"Error fetching orders: {error}")
         self.display_message(f"❌ Error: {str(error)}")
         self.message_label.text = "❌ Error loading orders."
         self.message_label.color = (1, 0, 0, 1)
 
+    @staticmethod
+    def _row_data(order):
+        """RecycleView data for one order row."""
+        return {
+            'order_id': order['id'],
+            'text': f"ID: {order['id']} | User: {order.get('user_id', 'Unknown')} | {order.get('service_name', 'Unknown')} | {order['status']}"
+        }
+
     def display_orders(self, orders):
-        """Display orders in the orders list."""
-        self.orders_list.clear_widgets()
+        """Display orders in the recycled orders list."""
         if not orders:
             self.display_message("No pending orders.")
             return
-        
+        self.orders_view.data = [self._row_data(order) for order in orders]
+
+    def update_rows(self, orders):
+        """Update the rows of changed orders in place, without rebuilding the list."""
+        positions = {row['order_id']: index for index, row in enumerate(self.orders_view.data)}
         for order in orders:
-            order_box = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
-            order_label = Label(
-                text=f"ID: {order['id']} | User: {order.get('user_id', 'Unknown')} | {order.get('service_name', 'Unknown')} | {order['status']}",
-                size_hint=(0.6, 1))
-            confirm_order_button = Button(
-                text="Confirm Order",
-                size_hint=(0.2, 1),
-                background_color=(0, 1, 0, 1),
-                color=(1, 1, 1, 1))
-            confirm_order_button.bind(on_press=partial(self.confirm_order, order['id']))
-            confirm_payment_button = Button(
-                text="Confirm Payment",
-                size_hint=(0.2, 1),
-                background_color=(0.8, 0.8, 0, 1),
-                color=(1, 1, 1, 1))
-            confirm_payment_button.bind(on_press=partial(self.confirm_payment, order['id']))
-            
-            order_box.add_widget(order_label)
-            order_box.add_widget(confirm_order_button)
-            order_box.add_widget(confirm_payment_button)
-            self.orders_list.add_widget(order_box)
+            index = positions.get(order['id'])
+            if index is not None:
+                self.orders_view.data[index] = self._row_data(order)
 
     def confirm_order(self, order_id, instance):
         """Confirm an order by updating its status."""
@@ -1211,7 +1454,7 @@ class AdminDashboard(Screen):
         self.show_popup("Success", f"Order {order_id} confirmed successfully!")
         self.message_label.text = "✅ Order confirmed."
         self.message_label.color = (0, 1, 0, 1)
-        Clock.schedule_once(lambda dt: self.fetch_orders(None), 0.5)
+        self._apply_order_result(result)
 
     def on_confirm_order_failure(self, req, result):
         """Handle order confirmation failure."""
@@ -1263,7 +1506,14 @@ class AdminDashboard(Screen):
         self.show_popup("Success", f"Payment for order {order_id} confirmed successfully!")
         self.message_label.text = "✅ Payment confirmed."
         self.message_label.color = (0, 1, 0, 1)
-        Clock.schedule_once(lambda dt: self.fetch_orders(None), 0.5)
+        self._apply_order_result(result)
+
+    def _apply_order_result(self, result):
+        """Apply the order returned by a PATCH to the store and its row."""
+        order = result.get('order')
+        if order:
+            changed, _ = App.get_running_app().order_store.apply_updates([order])
+            self.update_rows(changed)
 
     def on_confirm_payment_failure(self, req, result):
         """Handle payment confirmation failure."""
@@ -1280,28 +1530,31 @@ class AdminDashboard(Screen):
         self.message_label.text = "❌ Payment confirmation error."
         self.message_label.color = (1, 0, 0, 1)
 
-    def handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        if not hasattr(App.get_running_app(), 'sio'):
-            logger.warning("Socket.IO not initialized. Skipping order update.")
+    def handle_order_update(self, changed, missing):
+        """Apply pushed order updates from the shared store; refetch only for unseen orders."""
+        if missing:
+            self.fetch_orders(None)
             return
-        logger.info(f"Received order update: {data}")
-        self.message_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
-        self.message_label.color = (0, 1, 0, 1)
-        Clock.schedule_once(lambda dt: self.fetch_orders(None), 0.5)
+        if changed:
+            order = changed[-1]
+            self.message_label.text = f"🔄 Order {order.get('id')} updated: {order.get('status')}"
+            self.message_label.color = (0, 1, 0, 1)
+            self.update_rows(changed)
 
     def logout_user(self, instance):
         """Log out the admin user."""
         logger.info("Logging out admin user")
-        app = App.get_running_app()
-        app.token = None
-        app.user_id = None
+        self._page_request = None
+        self.loading = False
+        self.next_cursor = None
+        App.get_running_app().logout()
         self.manager.current = 'login'
 
     def display_message(self, message):
-        """Display a message in the orders list."""
-        self.orders_list.clear_widgets()
-        self.orders_list.add_widget(Label(text=message, size_hint=(1, None), height=40, color=(0.8, 0.2, 0.2, 1)))
+        """Display a message in place of the orders list."""
+        self.orders_view.data = []
+        self.message_label.text = message
+        self.message_label.color = (0.8, 0.2, 0.2, 1)
 
     def show_popup(self, title, message):
         """Show a popup with a message."""
@@ -1337,6 +1590,7 @@ class UserDashboard(Screen):
         self.layout.add_widget(self.message_label)
         
         # Tabbed panel for services
+        from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
         self.tabs = TabbedPanel(do_default_tab=False)
         
         # Home tab
@@ -1368,14 +1622,6 @@ class UserDashboard(Screen):
         # Initialize cart
         self.cart = []
 
-        # Register Socket.IO handler using app-level connection
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self.handle_order_update)
-            logger.info("Initialized UserDashboard with Socket.IO handler")
-        except AttributeError:
-            logger.error("Socket.IO not initialized in app. Real-time updates unavailable.")
-
     def on_enter(self):
         """Update title with user ID and fetch orders on entering the screen."""
         app = App.get_running_app()
@@ -1466,18 +1712,33 @@ class UserDashboard(Screen):
         """Handle successful orders fetch."""
         orders = result.get("orders", [])
         logger.info(f"Fetched {len(orders)} orders")
+        App.get_running_app().order_store.load(orders)
+        if self.render_orders():
+            self.message_label.text = "✅ Orders loaded."
+            self.message_label.color = (0, 1, 0, 1)
+
+    def render_orders(self):
+        """Render the orders list from the shared order store. Returns False if empty."""
+        orders = App.get_running_app().order_store.orders()
         self.orders_list.clear_widgets()
-        
         if not orders:
             self.message_label.text = "No orders placed yet."
             self.message_label.color = (1, 0, 0, 1)
-            return
-        
+            return False
         for order in orders:
             self.add_order_to_list(order)
-        
-        self.message_label.text = "✅ Orders loaded."
-        self.message_label.color = (0, 1, 0, 1)
+        return True
+
+    def handle_order_update(self, changed, missing):
+        """Apply pushed order updates from the shared store; refetch only for unseen orders."""
+        if missing:
+            self.fetch_orders(None)
+            return
+        if changed:
+            order = changed[-1]
+            self.render_orders()
+            self.message_label.text = f"🔄 Order {order.get('id')} updated: {order.get('status')}"
+            self.message_label.color = (0, 1, 0, 1)
 
     def on_fetch_orders_failure(self, req, result):
         """Handle orders fetch failure."""
@@ -1547,12 +1808,11 @@ class UserDashboard(Screen):
         self.message_label.color = (0, 1, 0, 1)
         logger.info(f"Fetching services for {category}")
         service_list.clear_widgets()
-        UrlRequest(
-            url=f"{app.server_url}/api/services/{category}",
-            req_headers={"Authorization": f"Bearer {app.token}"},
+        app.catalog_cache.fetch(
+            category,
             on_success=partial(self.on_fetch_services_success, category, service_list),
-            on_failure=self.on_fetch_services_failure,
-            on_error=self.on_fetch_services_error
+            on_failure=partial(self.on_fetch_services_failure, category, service_list),
+            on_error=partial(self.on_fetch_services_error, category, service_list)
         )
 
     def on_fetch_services_success(self, category, service_list, req, result):
@@ -1571,24 +1831,18 @@ class UserDashboard(Screen):
         self.message_label.text = f"✅ {category.capitalize()} services loaded."
         self.message_label.color = (0, 1, 0, 1)
 
-    def on_fetch_services_failure(self, req, result):
+    def on_fetch_services_failure(self, category, service_list, req, result):
         """Handle services fetch failure."""
-        category = req.url.split('/')[-1]
-        service_list = getattr(self, f"{category}_services_list", None)
         error = result.get("error", f"Failed to fetch services (Status: {req.resp_status})")
         logger.warning(f"Service fetch failed for {category}: {error}")
-        if service_list:
-            self.display_message(service_list, f"❌ {error}")
+        self.display_message(service_list, f"❌ {error}")
         self.message_label.text = f"❌ Failed to load {category} services."
         self.message_label.color = (1, 0, 0, 1)
 
-    def on_fetch_services_error(self, req, error):
+    def on_fetch_services_error(self, category, service_list, req, error):
         """Handle services fetch error."""
-        category = req.url.split('/')[-1]
-        service_list = getattr(self, f"{category}_services_list", None)
         logger.error(f"Error fetching services for {category}: {error}")
-        if service_list:
-            self.display_message(service_list, f"❌ Error: {str(error)}")
+        self.display_message(service_list, f"❌ Error: {str(error)}")
         self.message_label.text = f"❌ Error loading {category} services."
         self.message_label.color = (1, 0, 0, 1)
 
@@ -1712,9 +1966,7 @@ class UserDashboard(Screen):
     def logout_user(self, instance):
         """Log out the user."""
         logger.info("Logging out user")
-        app = App.get_running_app()
-        app.token = None
-        app.user_id = None
+        App.get_running_app().logout()
         self.manager.current = 'login'
 
     def display_message(self, widget, message):
@@ -1914,28 +2166,49 @@ class HomeScreen(Screen):
     def logout_user(self, instance):
         """Log out and redirect to login screen."""
         logger.info("Logging out from HomeScreen")
-        app = App.get_running_app()
-        app.token = None
-        app.user_id = None
-        app.cart = []  # Clear cart on logout
+        App.get_running_app().logout()
         self.manager.current = 'login'
 
 
-class CleaningScreen(Screen):
+# Per-screen settings for CategoryScreen: backend category, title, prompt and item nouns
+CATEGORY_SCREENS = {
+    "cleaning": {"category": "cleaning", "title": "🧹 Cleaning Services", "prompt": "Choose cleaning service:",
+                 "item": "cleaning service", "items": "services"},
+    "food": {"category": "food", "title": "🍔 Food Delivery", "prompt": "Choose food item:",
+             "item": "food item", "items": "food items"},
+    "groceries": {"category": "groceries", "title": "🛒 Groceries Delivery", "prompt": "Choose grocery item:",
+                  "item": "grocery item", "items": "groceries"},
+    "fruit": {"category": "fruits", "title": "🍎 Fruit Delivery", "prompt": "Choose fruit:",
+              "item": "fruit", "items": "fruits"},
+    "gardening": {"category": "gardening", "title": "🌿 Gardening Services", "prompt": "Choose a service:",
+                  "item": "service", "items": "services"},
+}
+
+
+class CategoryScreen(Screen):
+    """Service picker for one category, configured from CATEGORY_SCREENS by screen name."""
+
     def __init__(self, **kwargs):
-        super(CleaningScreen, self).__init__(**kwargs)
+        super(CategoryScreen, self).__init__(**kwargs)
+        settings = CATEGORY_SCREENS[self.name]
+        self.category = settings["category"]
+        self.title = settings["title"]
+        self.prompt = settings["prompt"]
+        self.item = settings["item"]
+        self.items = settings["items"]
+        self.select_text = f"Select {self.item.title()}"
+        self.empty_text = f"No {self.items.title()}"
         self.layout = BoxLayout(orientation='vertical', padding=15, spacing=10)
         self.services = []  # Store full service data for mapping name to ID
 
         self._setup_ui()
-        self._setup_socket_io_handler()
-        logger.info("Initialized CleaningScreen")
+        logger.info(f"Initialized CategoryScreen for {self.category}")
 
     def _setup_ui(self):
         """Set up the UI components."""
         # Title
         self.layout.add_widget(Label(
-            text="🧹 Cleaning Services",
+            text=self.title,
             font_size='22sp',
             bold=True,
             size_hint=(1, None),
@@ -1953,9 +2226,9 @@ class CleaningScreen(Screen):
         self.layout.add_widget(self.feedback_label)
 
         # Service selection
-        self.layout.add_widget(Label(text="Choose cleaning service:", color=(0, 0, 0, 1)))
+        self.layout.add_widget(Label(text=self.prompt, color=(0, 0, 0, 1)))
         self.service_spinner = Spinner(
-            text='Loading Services...',
+            text=f'Loading {self.items.title()}...',
             values=[],
             size_hint=(None, None),
             size=('250dp', '44dp')
@@ -1973,16 +2246,6 @@ class CleaningScreen(Screen):
         )
         self.layout.add_widget(self.price_label)
 
-        # Location input
-        self.layout.add_widget(Label(text="Enter delivery location:", color=(0, 0, 0, 1)))
-        self.location_input = TextInput(
-            hint_text="Delivery Location",
-            multiline=False,
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.location_input)
-
         # Quantity input
         self.layout.add_widget(Label(text="Enter quantity:", color=(0, 0, 0, 1)))
         self.quantity_input = TextInput(
@@ -1994,6 +2257,16 @@ class CleaningScreen(Screen):
         )
         self.layout.add_widget(self.quantity_input)
 
+        # Location input
+        self.layout.add_widget(Label(text="Enter delivery location:", color=(0, 0, 0, 1)))
+        self.location_input = TextInput(
+            hint_text="Delivery Location",
+            multiline=False,
+            size_hint=(1, None),
+            height='44dp'
+        )
+        self.layout.add_widget(self.location_input)
+
         # Add to Cart button
         add_to_cart_button = Button(
             text="Add to Cart",
@@ -2032,25 +2305,16 @@ class CleaningScreen(Screen):
 
         self.add_widget(self.layout)
 
-    def _setup_socket_io_handler(self):
-        """Set up Socket.IO handler for real-time updates."""
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self._handle_order_update)
-            logger.info("Socket.IO handler registered for order updates")
-        except AttributeError as e:
-            logger.error(f"Socket.IO not initialized: {e}")
-
     def on_enter(self):
         """Fetch services when entering the screen."""
-        logger.info("Entering CleaningScreen")
+        logger.info(f"Entering CategoryScreen for {self.category}")
         self.feedback_label.text = ""
         self.location_input.text = ""
         self.quantity_input.text = "1"
         Clock.schedule_once(lambda dt: self._fetch_services(), 0)
 
     def _fetch_services(self):
-        """Fetch cleaning services from the backend."""
+        """Fetch this category's services from the backend."""
         app = App.get_running_app()
         if not app.token:
             self.feedback_label.text = "⚠ Authentication error. Please log in again."
@@ -2059,12 +2323,11 @@ class CleaningScreen(Screen):
             self.manager.current = 'login'
             return
 
-        self.feedback_label.text = "🔄 Loading services..."
+        self.feedback_label.text = f"🔄 Loading {self.items}..."
         self.feedback_label.color = (0, 1, 0, 1)
-        logger.info("Fetching cleaning services")
-        UrlRequest(
-            url=f'{app.server_url}/api/services/cleaning',
-            req_headers={'Authorization': f'Bearer {app.token}'},
+        logger.info(f"Fetching {self.category} services")
+        app.catalog_cache.fetch(
+            self.category,
             on_success=self._on_fetch_services_success,
             on_failure=self._on_fetch_services_failure,
             on_error=self._on_fetch_services_error
@@ -2073,28 +2336,28 @@ class CleaningScreen(Screen):
     def _on_fetch_services_success(self, req, result):
         """Handle successful services fetch."""
         self.services = result.get("services", [])
-        logger.info(f"Fetched {len(self.services)} cleaning services")
+        logger.info(f"Fetched {len(self.services)} {self.category} services")
         if not self.services:
-            self.feedback_label.text = "No cleaning services available."
+            self.feedback_label.text = f"No {self.items} available."
             self.feedback_label.color = (1, 0, 0, 1)
-            self.service_spinner.text = "No Services"
+            self.service_spinner.text = self.empty_text
             self.service_spinner.values = []
             return
         self.service_spinner.values = [service['name'] for service in self.services]
-        self.service_spinner.text = "Select Cleaning Service"
-        self.feedback_label.text = "✅ Services loaded."
+        self.service_spinner.text = self.select_text
+        self.feedback_label.text = f"✅ {self.items.capitalize()} loaded."
         self.feedback_label.color = (0, 1, 0, 1)
 
     def _on_fetch_services_failure(self, req, result):
         """Handle services fetch failure."""
-        error = result.get("error", f"Failed to fetch services (Status: {req.resp_status})")
+        error = result.get("error", f"Failed to fetch {self.items} (Status: {req.resp_status})")
         logger.warning(f"Service fetch failed: {error}")
         self.feedback_label.text = f"❌ {error}"
         self.feedback_label.color = (1, 0, 0, 1)
 
     def _on_fetch_services_error(self, req, error):
         """Handle services fetch error."""
-        logger.error(f"Error fetching services: {error}")
+        logger.error(f"Error fetching {self.category} services: {error}")
         self.feedback_label.text = f"❌ Error: {str(error)}"
         self.feedback_label.color = (1, 0, 0, 1)
 
@@ -2108,14 +2371,14 @@ class CleaningScreen(Screen):
 
     def _add_to_cart(self, instance):
         """Add the selected service to the cart."""
-        cleaning_service = self.service_spinner.text
+        selected_service = self.service_spinner.text
         location = self.location_input.text.strip()
         quantity_text = self.quantity_input.text.strip()
 
-        if cleaning_service == "Select Cleaning Service" or cleaning_service == "No Services":
-            self.feedback_label.text = "⚠ Please select a cleaning service."
+        if selected_service == self.select_text or selected_service == self.empty_text:
+            self.feedback_label.text = f"⚠ Please select a {self.item}."
             self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No service selected")
+            logger.warning(f"No {self.item} selected")
             return
         if not location:
             self.feedback_label.text = "⚠ Please enter the delivery location."
@@ -2132,23 +2395,23 @@ class CleaningScreen(Screen):
         if not hasattr(app, 'cart'):
             app.cart = []
 
-        service_id = next((s['id'] for s in self.services if s['name'] == cleaning_service), None)
-        price = next((s['price'] for s in self.services if s['name'] == cleaning_service), 0)
+        service_id = next((s['id'] for s in self.services if s['name'] == selected_service), None)
+        price = next((s['price'] for s in self.services if s['name'] == selected_service), 0)
         if not service_id:
-            self.feedback_label.text = "⚠ Service not found."
+            self.feedback_label.text = f"⚠ {self.item.capitalize()} not found."
             self.feedback_label.color = (1, 0, 0, 1)
             logger.error("Service ID not found")
             return
 
         cart_item = {
             "service_id": service_id,
-            "service_name": cleaning_service,
+            "service_name": selected_service,
             "price": price * int(quantity_text),
             "quantity": int(quantity_text),
             "location": location
         }
         app.cart.append(cart_item)
-        self.feedback_label.text = f"✅ Added {cleaning_service} to cart."
+        self.feedback_label.text = f"✅ Added {selected_service} to cart."
         self.feedback_label.color = (0, 1, 0, 1)
         logger.info(f"Added to cart: {cart_item}")
 
@@ -2162,28 +2425,29 @@ class CleaningScreen(Screen):
         logger.info("Navigating back to HomeScreen")
         self.manager.current = 'home'
 
-    def _handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        logger.info(f"Received order update: {data}")
-        self.feedback_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
+    def handle_order_update(self, changed, missing):
+        """Show a notice for order updates applied to the shared order store."""
+        if not changed:
+            return
+        order = changed[-1]
+        self.feedback_label.text = f"🔄 Order {order.get('id')} updated: {order.get('status')}"
         self.feedback_label.color = (0, 1, 0, 1)
 
 
-class FoodScreen(Screen):
+
+
+class CartScreen(Screen):
     def __init__(self, **kwargs):
-        super(FoodScreen, self).__init__(**kwargs)
+        super(CartScreen, self).__init__(**kwargs)
         self.layout = BoxLayout(orientation='vertical', padding=15, spacing=10)
-        self.services = []  # Store full service data for mapping name to ID
-
         self._setup_ui()
-        self._setup_socket_io_handler()
-        logger.info("Initialized FoodScreen")
+        logger.info("Initialized CartScreen")
 
     def _setup_ui(self):
         """Set up the UI components."""
         # Title
         self.layout.add_widget(Label(
-            text="🍔 Food Delivery",
+            text="🛒 Your Cart",
             font_size='22sp',
             bold=True,
             size_hint=(1, None),
@@ -2200,71 +2464,34 @@ class FoodScreen(Screen):
         )
         self.layout.add_widget(self.feedback_label)
 
-        # Service selection
-        self.layout.add_widget(Label(text="Choose food item:", color=(0, 0, 0, 1)))
-        self.service_spinner = Spinner(
-            text='Loading Food Items...',
-            values=[],
-            size_hint=(None, None),
-            size=('250dp', '44dp')
-        )
-        self.service_spinner.bind(text=self._update_price)
-        self.layout.add_widget(self.service_spinner)
+        # Cart items list with scroll view
+        self.cart_list = GridLayout(cols=1, spacing=10, size_hint_y=None)
+        self.cart_list.bind(minimum_height=self.cart_list.setter('height'))
+        scrollview = ScrollView(size_hint=(1, 0.7))
+        scrollview.add_widget(self.cart_list)
+        self.layout.add_widget(scrollview)
 
-        # Price display
-        self.price_label = Label(
-            text="Price: KES 0",
-            font_size='16sp',
+        # Total amount label
+        self.total_label = Label(
+            text="Total: KES 0",
+            font_size='18sp',
             size_hint=(1, None),
-            height='30dp',
+            height='40dp',
             color=(0, 0, 0, 1)
         )
-        self.layout.add_widget(self.price_label)
-
-        # Quantity input
-        self.layout.add_widget(Label(text="Enter quantity:", color=(0, 0, 0, 1)))
-        self.quantity_input = TextInput(
-            hint_text="1",
-            multiline=False,
-            input_filter='int',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.quantity_input)
-
-        # Location input
-        self.layout.add_widget(Label(text="Enter delivery location:", color=(0, 0, 0, 1)))
-        self.location_input = TextInput(
-            hint_text="Delivery Location",
-            multiline=False,
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.location_input)
+        self.layout.add_widget(self.total_label)
 
-        # Add to Cart button
-        add_to_cart_button = Button(
-            text="Add to Cart",
+        # Checkout button
+        checkout_button = Button(
+            text="Checkout",
             background_color=(0.2, 0.6, 0.2, 1),
             color=(1, 1, 1, 1),
             font_size='18sp',
             size_hint=(1, None),
-            height='44dp'
-        )
-        add_to_cart_button.bind(on_press=self._add_to_cart)
-        self.layout.add_widget(add_to_cart_button)
-
-        # Cart button
-        cart_button = Button(
-            text="🛒 Go to Cart",
-            background_color=(0.9, 0.9, 0.1, 1),
-            color=(0, 0, 0, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
+            height='50dp'
         )
-        cart_button.bind(on_press=self._go_to_cart)
-        self.layout.add_widget(cart_button)
+        checkout_button.bind(on_press=self._initiate_payment)
+        self.layout.add_widget(checkout_button)
 
         # Back button
         back_button = Button(
@@ -2273,972 +2500,20 @@ class FoodScreen(Screen):
             color=(1, 1, 1, 1),
             font_size='18sp',
             size_hint=(1, None),
-            height='44dp'
+            height='50dp'
         )
         back_button.bind(on_press=self._go_back_home)
         self.layout.add_widget(back_button)
 
         self.add_widget(self.layout)
 
-    def _setup_socket_io_handler(self):
-        """Set up Socket.IO handler for real-time updates."""
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self._handle_order_update)
-            logger.info("Socket.IO handler registered for order updates")
-        except AttributeError as e:
-            logger.error(f"Socket.IO not initialized: {e}")
-
     def on_enter(self):
-        """Fetch services when entering the screen."""
-        logger.info("Entering FoodScreen")
-        self.feedback_label.text = ""
-        self.location_input.text = ""
-        self.quantity_input.text = "1"
-        Clock.schedule_once(lambda dt: self._fetch_services(), 0)
+        """Update the cart display when entering the screen."""
+        logger.info("Entering CartScreen")
+        self._update_cart_display()
 
-    def _fetch_services(self):
-        """Fetch food services from the backend."""
-        app = App.get_running_app()
-        if not app.token:
-            self.feedback_label.text = "⚠ Authentication error. Please log in again."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No token found for fetch_services")
-            self.manager.current = 'login'
-            return
-
-        self.feedback_label.text = "🔄 Loading food items..."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info("Fetching food services")
-        UrlRequest(
-            url=f'{app.server_url}/api/services/food',
-            req_headers={'Authorization': f'Bearer {app.token}'},
-            on_success=self._on_fetch_services_success,
-            on_failure=self._on_fetch_services_failure,
-            on_error=self._on_fetch_services_error
-        )
-
-    def _on_fetch_services_success(self, req, result):
-        """Handle successful services fetch."""
-        self.services = result.get("services", [])
-        logger.info(f"Fetched {len(self.services)} food services")
-        if not self.services:
-            self.feedback_label.text = "No food items available."
-            self.feedback_label.color = (1, 0, 0, 1)
-            self.service_spinner.text = "No Food Items"
-            self.service_spinner.values = []
-            return
-        self.service_spinner.values = [service['name'] for service in self.services]
-        self.service_spinner.text = "Select Food Item"
-        self.feedback_label.text = "✅ Food items loaded."
-        self.feedback_label.color = (0, 1, 0, 1)
-
-    def _on_fetch_services_failure(self, req, result):
-        """Handle services fetch failure."""
-        error = result.get("error", f"Failed to fetch food items (Status: {req.resp_status})")
-        logger.warning(f"Service fetch failed: {error}")
-        self.feedback_label.text = f"❌ {error}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _on_fetch_services_error(self, req, error):
-        """Handle services fetch error."""
-        logger.error(f"Error fetching food services: {error}")
-        self.feedback_label.text = f"❌ Error: {str(error)}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _update_price(self, spinner, text):
-        """Update price label based on selected service."""
-        for service in self.services:
-            if service['name'] == text:
-                self.price_label.text = f"Price: KES {service['price']}"
-                logger.info(f"Updated price for {text}: KES {service['price']}")
-                break
-
-    def _add_to_cart(self, instance):
-        """Add the selected food item to the cart."""
-        food_service = self.service_spinner.text
-        location = self.location_input.text.strip()
-        quantity_text = self.quantity_input.text.strip()
-
-        if food_service == "Select Food Item" or food_service == "No Food Items":
-            self.feedback_label.text = "⚠ Please select a food item."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No food item selected")
-            return
-        if not location:
-            self.feedback_label.text = "⚠ Please enter the delivery location."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No location provided")
-            return
-        if not quantity_text.isdigit() or int(quantity_text) <= 0:
-            self.feedback_label.text = "⚠ Quantity must be a positive number."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("Invalid quantity")
-            return
-
-        app = App.get_running_app()
-        if not hasattr(app, 'cart'):
-            app.cart = []
-
-        service_id = next((s['id'] for s in self.services if s['name'] == food_service), None)
-        price = next((s['price'] for s in self.services if s['name'] == food_service), 0)
-        if not service_id:
-            self.feedback_label.text = "⚠ Food item not found."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.error("Service ID not found")
-            return
-
-        cart_item = {
-            "service_id": service_id,
-            "service_name": food_service,
-            "price": price * int(quantity_text),
-            "quantity": int(quantity_text),
-            "location": location
-        }
-        app.cart.append(cart_item)
-        self.feedback_label.text = f"✅ Added {food_service} to cart."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info(f"Added to cart: {cart_item}")
-
-    def _go_to_cart(self, instance):
-        """Navigate to the cart screen."""
-        logger.info("Navigating to CartScreen")
-        self.manager.current = 'cart'
-
-    def _go_back_home(self, instance):
-        """Navigate back to home screen."""
-        logger.info("Navigating back to HomeScreen")
-        self.manager.current = 'home'
-
-    def _handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        logger.info(f"Received order update: {data}")
-        self.feedback_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
-        self.feedback_label.color = (0, 1, 0, 1)
-
-
-class GroceriesScreen(Screen):
-    def __init__(self, **kwargs):
-        super(GroceriesScreen, self).__init__(**kwargs)
-        self.layout = BoxLayout(orientation='vertical', padding=15, spacing=10)
-        self.services = []  # Store full service data for mapping name to ID
-
-        self._setup_ui()
-        self._setup_socket_io_handler()
-        logger.info("Initialized GroceriesScreen")
-
-    def _setup_ui(self):
-        """Set up the UI components."""
-        # Title
-        self.layout.add_widget(Label(
-            text="🛒 Groceries Delivery",
-            font_size='22sp',
-            bold=True,
-            size_hint=(1, None),
-            height='50dp',
-            color=(0, 0, 0, 1)
-        ))
-
-        # Feedback label
-        self.feedback_label = Label(
-            text="",
-            size_hint=(1, None),
-            height='30dp',
-            color=(1, 0, 0, 1)
-        )
-        self.layout.add_widget(self.feedback_label)
-
-        # Service selection
-        self.layout.add_widget(Label(text="Choose grocery item:", color=(0, 0, 0, 1)))
-        self.service_spinner = Spinner(
-            text='Loading Groceries...',
-            values=[],
-            size_hint=(None, None),
-            size=('250dp', '44dp')
-        )
-        self.service_spinner.bind(text=self._update_price)
-        self.layout.add_widget(self.service_spinner)
-
-        # Price display
-        self.price_label = Label(
-            text="Price: KES 0",
-            font_size='16sp',
-            size_hint=(1, None),
-            height='30dp',
-            color=(0, 0, 0, 1)
-        )
-        self.layout.add_widget(self.price_label)
-
-        # Quantity input
-        self.layout.add_widget(Label(text="Enter quantity:", color=(0, 0, 0, 1)))
-        self.quantity_input = TextInput(
-            hint_text="1",
-            multiline=False,
-            input_filter='int',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.quantity_input)
-
-        # Location input
-        self.layout.add_widget(Label(text="Enter delivery location:", color=(0, 0, 0, 1)))
-        self.location_input = TextInput(
-            hint_text="Delivery Location",
-            multiline=False,
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.location_input)
-
-        # Add to Cart button
-        add_to_cart_button = Button(
-            text="Add to Cart",
-            background_color=(0.2, 0.6, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        add_to_cart_button.bind(on_press=self._add_to_cart)
-        self.layout.add_widget(add_to_cart_button)
-
-        # Cart button
-        cart_button = Button(
-            text="🛒 Go to Cart",
-            background_color=(0.9, 0.9, 0.1, 1),
-            color=(0, 0, 0, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        cart_button.bind(on_press=self._go_to_cart)
-        self.layout.add_widget(cart_button)
-
-        # Back button
-        back_button = Button(
-            text="Back to Home",
-            background_color=(0.6, 0.2, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        back_button.bind(on_press=self._go_back_home)
-        self.layout.add_widget(back_button)
-
-        self.add_widget(self.layout)
-
-    def _setup_socket_io_handler(self):
-        """Set up Socket.IO handler for real-time updates."""
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self._handle_order_update)
-            logger.info("Socket.IO handler registered for order updates")
-        except AttributeError as e:
-            logger.error(f"Socket.IO not initialized: {e}")
-
-    def on_enter(self):
-        """Fetch services when entering the screen."""
-        logger.info("Entering GroceriesScreen")
-        self.feedback_label.text = ""
-        self.location_input.text = ""
-        self.quantity_input.text = "1"
-        Clock.schedule_once(lambda dt: self._fetch_services(), 0)
-
-    def _fetch_services(self):
-        """Fetch grocery services from the backend."""
-        app = App.get_running_app()
-        if not app.token:
-            self.feedback_label.text = "⚠ Authentication error. Please log in again."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No token found for fetch_services")
-            self.manager.current = 'login'
-            return
-
-        self.feedback_label.text = "🔄 Loading groceries..."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info("Fetching grocery services")
-        UrlRequest(
-            url=f'{app.server_url}/api/services/groceries',
-            req_headers={'Authorization': f'Bearer {app.token}'},
-            on_success=self._on_fetch_services_success,
-            on_failure=self._on_fetch_services_failure,
-            on_error=self._on_fetch_services_error
-        )
-
-    def _on_fetch_services_success(self, req, result):
-        """Handle successful services fetch."""
-        self.services = result.get("services", [])
-        logger.info(f"Fetched {len(self.services)} grocery services")
-        if not self.services:
-            self.feedback_label.text = "No grocery items available."
-            self.feedback_label.color = (1, 0, 0, 1)
-            self.service_spinner.text = "No Groceries"
-            self.service_spinner.values = []
-            return
-        self.service_spinner.values = [service['name'] for service in self.services]
-        self.service_spinner.text = "Select Grocery Item"
-        self.feedback_label.text = "✅ Groceries loaded."
-        self.feedback_label.color = (0, 1, 0, 1)
-
-    def _on_fetch_services_failure(self, req, result):
-        """Handle services fetch failure."""
-        error = result.get("error", f"Failed to fetch groceries (Status: {req.resp_status})")
-        logger.warning(f"Service fetch failed: {error}")
-        self.feedback_label.text = f"❌ {error}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _on_fetch_services_error(self, req, error):
-        """Handle services fetch error."""
-        logger.error(f"Error fetching grocery services: {error}")
-        self.feedback_label.text = f"❌ Error: {str(error)}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _update_price(self, spinner, text):
-        """Update price label based on selected service."""
-        for service in self.services:
-            if service['name'] == text:
-                self.price_label.text = f"Price: KES {service['price']}"
-                logger.info(f"Updated price for {text}: KES {service['price']}")
-                break
-
-    def _add_to_cart(self, instance):
-        """Add the selected grocery item to the cart."""
-        grocery_service = self.service_spinner.text
-        location = self.location_input.text.strip()
-        quantity_text = self.quantity_input.text.strip()
-
-        if grocery_service == "Select Grocery Item" or grocery_service == "No Groceries":
-            self.feedback_label.text = "⚠ Please select a grocery item."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No grocery item selected")
-            return
-        if not location:
-            self.feedback_label.text = "⚠ Please enter the delivery location."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No location provided")
-            return
-        if not quantity_text.isdigit() or int(quantity_text) <= 0:
-            self.feedback_label.text = "⚠ Quantity must be a positive number."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("Invalid quantity")
-            return
-
-        app = App.get_running_app()
-        if not hasattr(app, 'cart'):
-            app.cart = []
-
-        service_id = next((s['id'] for s in self.services if s['name'] == grocery_service), None)
-        price = next((s['price'] for s in self.services if s['name'] == grocery_service), 0)
-        if not service_id:
-            self.feedback_label.text = "⚠ Grocery item not found."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.error("Service ID not found")
-            return
-
-        cart_item = {
-            "service_id": service_id,
-            "service_name": grocery_service,
-            "price": price * int(quantity_text),
-            "quantity": int(quantity_text),
-            "location": location
-        }
-        app.cart.append(cart_item)
-        self.feedback_label.text = f"✅ Added {grocery_service} to cart."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info(f"Added to cart: {cart_item}")
-
-    def _go_to_cart(self, instance):
-        """Navigate to the cart screen."""
-        logger.info("Navigating to CartScreen")
-        self.manager.current = 'cart'
-
-    def _go_back_home(self, instance):
-        """Navigate back to home screen."""
-        logger.info("Navigating back to HomeScreen")
-        self.manager.current = 'home'
-
-    def _handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        logger.info(f"Received grocery order update: {data}")
-        self.feedback_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
-        self.feedback_label.color = (0, 1, 0, 1)
-
-
-class FruitScreen(Screen):
-    def __init__(self, **kwargs):
-        super(FruitScreen, self).__init__(**kwargs)
-        self.layout = BoxLayout(orientation='vertical', padding=15, spacing=10)
-        self.services = []  # Store full service data for mapping name to ID
-
-        self._setup_ui()
-        self._setup_socket_io_handler()
-        logger.info("Initialized FruitScreen")
-
-    def _setup_ui(self):
-        """Set up the UI components."""
-        # Title
-        self.layout.add_widget(Label(
-            text="🍎 Fruit Delivery",
-            font_size='22sp',
-            bold=True,
-            size_hint=(1, None),
-            height='50dp',
-            color=(0, 0, 0, 1)
-        ))
-
-        # Feedback label
-        self.feedback_label = Label(
-            text="",
-            size_hint=(1, None),
-            height='30dp',
-            color=(1, 0, 0, 1)
-        )
-        self.layout.add_widget(self.feedback_label)
-
-        # Service selection
-        self.layout.add_widget(Label(text="Choose fruit:", color=(0, 0, 0, 1)))
-        self.service_spinner = Spinner(
-            text='Loading Fruits...',
-            values=[],
-            size_hint=(None, None),
-            size=('250dp', '44dp')
-        )
-        self.service_spinner.bind(text=self._update_price)
-        self.layout.add_widget(self.service_spinner)
-
-        # Price display
-        self.price_label = Label(
-            text="Price: KES 0",
-            font_size='16sp',
-            size_hint=(1, None),
-            height='30dp',
-            color=(0, 0, 0, 1)
-        )
-        self.layout.add_widget(self.price_label)
-
-        # Quantity input
-        self.layout.add_widget(Label(text="Enter quantity:", color=(0, 0, 0, 1)))
-        self.quantity_input = TextInput(
-            hint_text="1",
-            multiline=False,
-            input_filter='int',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.quantity_input)
-
-        # Location input
-        self.layout.add_widget(Label(text="Enter delivery location:", color=(0, 0, 0, 1)))
-        self.location_input = TextInput(
-            hint_text="Delivery Location",
-            multiline=False,
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.location_input)
-
-        # Add to Cart button
-        add_to_cart_button = Button(
-            text="Add to Cart",
-            background_color=(0.2, 0.6, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        add_to_cart_button.bind(on_press=self._add_to_cart)
-        self.layout.add_widget(add_to_cart_button)
-
-        # Cart button
-        cart_button = Button(
-            text="🛒 Go to Cart",
-            background_color=(0.9, 0.9, 0.1, 1),
-            color=(0, 0, 0, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        cart_button.bind(on_press=self._go_to_cart)
-        self.layout.add_widget(cart_button)
-
-        # Back button
-        back_button = Button(
-            text="Back to Home",
-            background_color=(0.6, 0.2, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        back_button.bind(on_press=self._go_back_home)
-        self.layout.add_widget(back_button)
-
-        self.add_widget(self.layout)
-
-    def _setup_socket_io_handler(self):
-        """Set up Socket.IO handler for real-time updates."""
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self._handle_order_update)
-            logger.info("Socket.IO handler registered for order updates")
-        except AttributeError as e:
-            logger.error(f"Socket.IO not initialized: {e}")
-
-    def on_enter(self):
-        """Fetch services when entering the screen."""
-        logger.info("Entering FruitScreen")
-        self.feedback_label.text = ""
-        self.location_input.text = ""
-        self.quantity_input.text = "1"
-        Clock.schedule_once(lambda dt: self._fetch_services(), 0)
-
-    def _fetch_services(self):
-        """Fetch fruit services from the backend."""
-        app = App.get_running_app()
-        if not app.token:
-            self.feedback_label.text = "⚠ Authentication error. Please log in again."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No token found for fetch_services")
-            self.manager.current = 'login'
-            return
-
-        self.feedback_label.text = "🔄 Loading fruits..."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info("Fetching fruit services")
-        UrlRequest(
-            url=f'{app.server_url}/api/services/fruits',
-            req_headers={'Authorization': f'Bearer {app.token}'},
-            on_success=self._on_fetch_services_success,
-            on_failure=self._on_fetch_services_failure,
-            on_error=self._on_fetch_services_error
-        )
-
-    def _on_fetch_services_success(self, req, result):
-        """Handle successful services fetch."""
-        self.services = result.get("services", [])
-        logger.info(f"Fetched {len(self.services)} fruit services")
-        if not self.services:
-            self.feedback_label.text = "No fruits available."
-            self.feedback_label.color = (1, 0, 0, 1)
-            self.service_spinner.text = "No Fruits"
-            self.service_spinner.values = []
-            return
-        self.service_spinner.values = [service['name'] for service in self.services]
-        self.service_spinner.text = "Select Fruit"
-        self.feedback_label.text = "✅ Fruits loaded."
-        self.feedback_label.color = (0, 1, 0, 1)
-
-    def _on_fetch_services_failure(self, req, result):
-        """Handle services fetch failure."""
-        error = result.get("error", f"Failed to fetch fruits (Status: {req.resp_status})")
-        logger.warning(f"Service fetch failed: {error}")
-        self.feedback_label.text = f"❌ {error}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _on_fetch_services_error(self, req, error):
-        """Handle services fetch error."""
-        logger.error(f"Error fetching fruit services: {error}")
-        self.feedback_label.text = f"❌ Error: {str(error)}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _update_price(self, spinner, text):
-        """Update price label based on selected service."""
-        for service in self.services:
-            if service['name'] == text:
-                self.price_label.text = f"Price: KES {service['price']}"
-                logger.info(f"Updated price for {text}: KES {service['price']}")
-                break
-
-    def _add_to_cart(self, instance):
-        """Add the selected fruit to the cart."""
-        fruit_service = self.service_spinner.text
-        location = self.location_input.text.strip()
-        quantity_text = self.quantity_input.text.strip()
-
-        if fruit_service == "Select Fruit" or fruit_service == "No Fruits":
-            self.feedback_label.text = "⚠ Please select a fruit."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No fruit selected")
-            return
-        if not location:
-            self.feedback_label.text = "⚠ Please enter the delivery location."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No location provided")
-            return
-        if not quantity_text.isdigit() or int(quantity_text) <= 0:
-            self.feedback_label.text = "⚠ Quantity must be a positive number."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("Invalid quantity")
-            return
-
-        app = App.get_running_app()
-        if not hasattr(app, 'cart'):
-            app.cart = []
-
-        service_id = next((s['id'] for s in self.services if s['name'] == fruit_service), None)
-        price = next((s['price'] for s in self.services if s['name'] == fruit_service), 0)
-        if not service_id:
-            self.feedback_label.text = "⚠ Fruit not found."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.error("Service ID not found")
-            return
-
-        cart_item = {
-            "service_id": service_id,
-            "service_name": fruit_service,
-            "price": price * int(quantity_text),
-            "quantity": int(quantity_text),
-            "location": location
-        }
-        app.cart.append(cart_item)
-        self.feedback_label.text = f"✅ Added {fruit_service} to cart."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info(f"Added to cart: {cart_item}")
-
-    def _go_to_cart(self, instance):
-        """Navigate to the cart screen."""
-        logger.info("Navigating to CartScreen")
-        self.manager.current = 'cart'
-
-    def _go_back_home(self, instance):
-        """Navigate back to home screen."""
-        logger.info("Navigating back to HomeScreen")
-        self.manager.current = 'home'
-
-    def _handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        logger.info(f"Received fruit order update: {data}")
-        self.feedback_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
-        self.feedback_label.color = (0, 1, 0, 1)
-
-
-class GardeningScreen(Screen):
-    def __init__(self, **kwargs):
-        super(GardeningScreen, self).__init__(**kwargs)
-        self.layout = BoxLayout(orientation='vertical', padding=15, spacing=10)
-        self.services = []  # Store full service data for mapping name to ID
-
-        self._setup_ui()
-        self._setup_socket_io_handler()
-        logger.info("Initialized GardeningScreen")
-
-    def _setup_ui(self):
-        """Set up the UI components."""
-        # Title
-        self.layout.add_widget(Label(
-            text="🌿 Gardening Services",
-            font_size='22sp',
-            bold=True,
-            size_hint=(1, None),
-            height='50dp',
-            color=(0, 0, 0, 1)
-        ))
-
-        # Feedback label
-        self.feedback_label = Label(
-            text="",
-            size_hint=(1, None),
-            height='30dp',
-            color=(1, 0, 0, 1)
-        )
-        self.layout.add_widget(self.feedback_label)
-
-        # Service selection
-        self.layout.add_widget(Label(text="Choose a service:", color=(0, 0, 0, 1)))
-        self.service_spinner = Spinner(
-            text='Loading Services...',
-            values=[],
-            size_hint=(None, None),
-            size=('250dp', '44dp')
-        )
-        self.service_spinner.bind(text=self._update_price)
-        self.layout.add_widget(self.service_spinner)
-
-        # Price display
-        self.price_label = Label(
-            text="Price: KES 0",
-            font_size='16sp',
-            size_hint=(1, None),
-            height='30dp',
-            color=(0, 0, 0, 1)
-        )
-        self.layout.add_widget(self.price_label)
-
-        # Quantity input
-        self.layout.add_widget(Label(text="Enter quantity:", color=(0, 0, 0, 1)))
-        self.quantity_input = TextInput(
-            hint_text="1",
-            multiline=False,
-            input_filter='int',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.quantity_input)
-
-        # Location input
-        self.layout.add_widget(Label(text="Enter delivery location:", color=(0, 0, 0, 1)))
-        self.location_input = TextInput(
-            hint_text="Delivery Location",
-            multiline=False,
-            size_hint=(1, None),
-            height='44dp'
-        )
-        self.layout.add_widget(self.location_input)
-
-        # Add to Cart button
-        add_to_cart_button = Button(
-            text="Add to Cart",
-            background_color=(0.2, 0.6, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        add_to_cart_button.bind(on_press=self._add_to_cart)
-        self.layout.add_widget(add_to_cart_button)
-
-        # Cart button
-        cart_button = Button(
-            text="🛒 Go to Cart",
-            background_color=(0.9, 0.9, 0.1, 1),
-            color=(0, 0, 0, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        cart_button.bind(on_press=self._go_to_cart)
-        self.layout.add_widget(cart_button)
-
-        # Back button
-        back_button = Button(
-            text="Back to Home",
-            background_color=(0.6, 0.2, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='44dp'
-        )
-        back_button.bind(on_press=self._go_back_home)
-        self.layout.add_widget(back_button)
-
-        self.add_widget(self.layout)
-
-    def _setup_socket_io_handler(self):
-        """Set up Socket.IO handler for real-time updates."""
-        try:
-            app = App.get_running_app()
-            app.sio.on("order_updated", self._handle_order_update)
-            logger.info("Socket.IO handler registered for order updates")
-        except AttributeError as e:
-            logger.error(f"Socket.IO not initialized: {e}")
-
-    def on_enter(self):
-        """Fetch services when entering the screen."""
-        logger.info("Entering GardeningScreen")
-        self.feedback_label.text = ""
-        self.location_input.text = ""
-        self.quantity_input.text = "1"
-        Clock.schedule_once(lambda dt: self._fetch_services(), 0)
-
-    def _fetch_services(self):
-        """Fetch gardening services from the backend."""
-        app = App.get_running_app()
-        if not app.token:
-            self.feedback_label.text = "⚠ Authentication error. Please log in again."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No token found for fetch_services")
-            self.manager.current = 'login'
-            return
-
-        self.feedback_label.text = "🔄 Loading services..."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info("Fetching gardening services")
-        UrlRequest(
-            url=f'{app.server_url}/api/services/gardening',
-            req_headers={'Authorization': f'Bearer {app.token}'},
-            on_success=self._on_fetch_services_success,
-            on_failure=self._on_fetch_services_failure,
-            on_error=self._on_fetch_services_error
-        )
-
-    def _on_fetch_services_success(self, req, result):
-        """Handle successful services fetch."""
-        self.services = result.get("services", [])
-        logger.info(f"Fetched {len(self.services)} gardening services")
-        if not self.services:
-            self.feedback_label.text = "No gardening services available."
-            self.feedback_label.color = (1, 0, 0, 1)
-            self.service_spinner.text = "No Services"
-            self.service_spinner.values = []
-            return
-        self.service_spinner.values = [service['name'] for service in self.services]
-        self.service_spinner.text = "Select Service"
-        self.feedback_label.text = "✅ Services loaded."
-        self.feedback_label.color = (0, 1, 0, 1)
-
-    def _on_fetch_services_failure(self, req, result):
-        """Handle services fetch failure."""
-        error = result.get("error", f"Failed to fetch services (Status: {req.resp_status})")
-        logger.warning(f"Service fetch failed: {error}")
-        self.feedback_label.text = f"❌ {error}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _on_fetch_services_error(self, req, error):
-        """Handle services fetch error."""
-        logger.error(f"Error fetching gardening services: {error}")
-        self.feedback_label.text = f"❌ Error: {str(error)}"
-        self.feedback_label.color = (1, 0, 0, 1)
-
-    def _update_price(self, spinner, text):
-        """Update price label based on selected service."""
-        for service in self.services:
-            if service['name'] == text:
-                self.price_label.text = f"Price: KES {service['price']}"
-                logger.info(f"Updated price for {text}: KES {service['price']}")
-                break
-
-    def _add_to_cart(self, instance):
-        """Add the selected gardening service to the cart."""
-        gardening_service = self.service_spinner.text
-        location = self.location_input.text.strip()
-        quantity_text = self.quantity_input.text.strip()
-
-        if gardening_service == "Select Service" or gardening_service == "No Services":
-            self.feedback_label.text = "⚠ Please select a service."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No service selected")
-            return
-        if not location:
-            self.feedback_label.text = "⚠ Please enter the delivery location."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("No location provided")
-            return
-        if not quantity_text.isdigit() or int(quantity_text) <= 0:
-            self.feedback_label.text = "⚠ Quantity must be a positive number."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.warning("Invalid quantity")
-            return
-
-        app = App.get_running_app()
-        if not hasattr(app, 'cart'):
-            app.cart = []
-
-        service_id = next((s['id'] for s in self.services if s['name'] == gardening_service), None)
-        price = next((s['price'] for s in self.services if s['name'] == gardening_service), 0)
-        if not service_id:
-            self.feedback_label.text = "⚠ Service not found."
-            self.feedback_label.color = (1, 0, 0, 1)
-            logger.error("Service ID not found")
-            return
-
-        cart_item = {
-            "service_id": service_id,
-            "service_name": gardening_service,
-            "price": price * int(quantity_text),
-            "quantity": int(quantity_text),
-            "location": location
-        }
-        app.cart.append(cart_item)
-        self.feedback_label.text = f"✅ Added {gardening_service} to cart."
-        self.feedback_label.color = (0, 1, 0, 1)
-        logger.info(f"Added to cart: {cart_item}")
-
-    def _go_to_cart(self, instance):
-        """Navigate to the cart screen."""
-        logger.info("Navigating to CartScreen")
-        self.manager.current = 'cart'
-
-    def _go_back_home(self, instance):
-        """Navigate back to home screen."""
-        logger.info("Navigating back to HomeScreen")
-        self.manager.current = 'home'
-
-    def _handle_order_update(self, data):
-        """Handle real-time order updates from WebSocket."""
-        logger.info(f"Received gardening order update: {data}")
-        self.feedback_label.text = f"🔄 Order {data.get('order_id')} updated: {data.get('status')}"
-        self.feedback_label.color = (0, 1, 0, 1)
-
-
-class CartScreen(Screen):
-    def __init__(self, **kwargs):
-        super(CartScreen, self).__init__(**kwargs)
-        self.layout = BoxLayout(orientation='vertical', padding=15, spacing=10)
-        self._setup_ui()
-        logger.info("Initialized CartScreen")
-
-    def _setup_ui(self):
-        """Set up the UI components."""
-        # Title
-        self.layout.add_widget(Label(
-            text="🛒 Your Cart",
-            font_size='22sp',
-            bold=True,
-            size_hint=(1, None),
-            height='50dp',
-            color=(0, 0, 0, 1)
-        ))
-
-        # Feedback label
-        self.feedback_label = Label(
-            text="",
-            size_hint=(1, None),
-            height='30dp',
-            color=(1, 0, 0, 1)
-        )
-        self.layout.add_widget(self.feedback_label)
-
-        # Cart items list with scroll view
-        self.cart_list = GridLayout(cols=1, spacing=10, size_hint_y=None)
-        self.cart_list.bind(minimum_height=self.cart_list.setter('height'))
-        scrollview = ScrollView(size_hint=(1, 0.7))
-        scrollview.add_widget(self.cart_list)
-        self.layout.add_widget(scrollview)
-
-        # Total amount label
-        self.total_label = Label(
-            text="Total: KES 0",
-            font_size='18sp',
-            size_hint=(1, None),
-            height='40dp',
-            color=(0, 0, 0, 1)
-        )
-        self.layout.add_widget(self.total_label)
-
-        # Checkout button
-        checkout_button = Button(
-            text="Checkout",
-            background_color=(0.2, 0.6, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='50dp'
-        )
-        checkout_button.bind(on_press=self._initiate_payment)
-        self.layout.add_widget(checkout_button)
-
-        # Back button
-        back_button = Button(
-            text="Back to Home",
-            background_color=(0.6, 0.2, 0.2, 1),
-            color=(1, 1, 1, 1),
-            font_size='18sp',
-            size_hint=(1, None),
-            height='50dp'
-        )
-        back_button.bind(on_press=self._go_back_home)
-        self.layout.add_widget(back_button)
-
-        self.add_widget(self.layout)
-
-    def on_enter(self):
-        """Update the cart display when entering the screen."""
-        logger.info("Entering CartScreen")
-        self._update_cart_display()
-
-    def _update_cart_display(self):
-        """Update the cart items and total amount."""
+    def _update_cart_display(self):
+        """Update the cart items and total amount."""
         app = App.get_running_app()
         self.cart_list.clear_widgets()
         total_amount = 0
@@ -3335,6 +2610,39 @@ class CartScreen(Screen):
             self.manager.current = 'login'
             return
 
+        # The server charges what is in its cart table, so replace it with ours in one call first
+        cart_data = {
+            "items": [
+                {
+                    "service_id": item['service_id'],
+                    "quantity": item.get('quantity', 1),
+                    "location": item.get('location', "")
+                }
+                for item in app.cart
+            ]
+        }
+        headers = {
+            "Authorization": f"Bearer {app.token}",
+            "Content-Type": "application/json"
+        }
+        logger.info(f"Syncing cart before payment: {len(app.cart)} items")
+        self.feedback_label.text = "🔄 Syncing cart..."
+        self.feedback_label.color = (0, 1, 0, 1)
+
+        UrlRequest(
+            url=f"{app.server_url}/api/cart",
+            method='PUT',
+            req_body=json.dumps(cart_data),
+            req_headers=headers,
+            on_success=lambda req, result: self._send_payment_request(phone_number, total_amount),
+            on_failure=self._on_payment_failure,
+            on_error=self._on_payment_error
+        )
+        popup.dismiss()
+
+    def _send_payment_request(self, phone_number, total_amount):
+        """Start the M-Pesa payment once the server-side cart matches the local one."""
+        app = App.get_running_app()
         payment_data = {
             "phone_number": phone_number,
             "amount": str(total_amount),  # Backend expects string
@@ -3358,7 +2666,6 @@ class CartScreen(Screen):
             on_failure=self._on_payment_failure,
             on_error=self._on_payment_error
         )
-        popup.dismiss()
 
     def _on_payment_success(self, req, result):
         """Handle successful payment initiation."""
@@ -3395,14 +2702,17 @@ class ServiceApp(App):
         super().__init__(**kwargs)
         self.config = configparser.ConfigParser()
         self._load_config()  # Load and validate the configuration file
-        self.sio = socketio.Client()  # Initialize Socket.IO client
+        self.sio = None  # Socket.IO client, created on first connect_socketio()
+        self._sio_closing = False  # Set while we disconnect on purpose, so the client does not reconnect
         self.server_url = self.config.get("Server", "url", fallback=self.DEFAULT_SERVER_URL)
         self.token = None
         self.user_id = None
         self.cart = []  # Initialize cart to store selected items
-        self.session = requests.Session()
+        self.order_store = OrderStore()  # Orders shared by all screens, kept current by Socket.IO deltas
         self._directory = self._get_storage_path()  # Use a private attribute for directory
+        self.catalog_cache = CatalogCache(os.path.join(self._directory, "catalog_cache.json"))
         self._is_running = True  # Flag to control the app's lifecycle
+        self._startup_timings = {}  # Seconds since process start for import, build() and first frame
 
     @property
     def directory(self):
@@ -3464,11 +2774,14 @@ class ServiceApp(App):
             return Image()
 
     def connect_socketio(self):
-        """Establish a Socket.IO connection with reconnection support."""
+        """Establish an authenticated Socket.IO connection with reconnection support."""
         def attempt_connection(attempt=1, max_attempts=3):
             try:
+                if not self.token:
+                    logger.info("Not logged in; skipping Socket.IO connection")
+                    return False
                 logger.info(f"Attempting Socket.IO connection to {self.server_url} (Attempt {attempt}/{max_attempts})")
-                self.sio.connect(self.server_url, wait_timeout=5)
+                self.sio.connect(self.server_url, auth={"token": self.token}, wait_timeout=5)
                 logger.info("Socket.IO connected successfully")
                 return True
             except Exception as e:
@@ -3484,28 +2797,62 @@ class ServiceApp(App):
             logger.error("Server URL is not set. Cannot connect to Socket.IO.")
             return
 
+        if self.sio is None:
+            import socketio
+            self.sio = socketio.Client()
+
+        # Reconnect so the server re-authenticates with the current token
+        self.disconnect_socketio()
+
         # Run connection attempts in a separate thread to avoid blocking the main thread
         Thread(target=attempt_connection, daemon=True).start()
 
         @self.sio.event
         def connect():
+            self._sio_closing = False
             logger.info("Socket.IO connection established")
 
         @self.sio.event
         def disconnect():
+            if self._sio_closing:
+                logger.info("Socket.IO disconnected")
+                return
             logger.warning("Socket.IO disconnected")
             Clock.schedule_once(lambda dt: attempt_connection(), 2)
 
         @self.sio.on("order_updated")
         def on_order_updated(data):
             logger.info(f"Order update received: {data}")
-            # Broadcast order updates to all screens
-            for screen in self.root.screens:
-                if hasattr(screen, "handle_order_update"):
-                    screen.handle_order_update(data)
+            updates = data.get("updates", [data]) if isinstance(data, dict) else []
+            # Socket.IO callbacks run on a background thread; touch widgets on the Clock thread
+            Clock.schedule_once(lambda dt: self.apply_order_updates(updates), 0)
+
+    def disconnect_socketio(self):
+        """Close the Socket.IO connection without triggering the automatic reconnect."""
+        if self.sio is not None and self.sio.connected:
+            self._sio_closing = True
+            self.sio.disconnect()
+
+    def logout(self):
+        """Forget the session and close the Socket.IO connection opened for it."""
+        self.token = None
+        self.user_id = None
+        self.cart = []
+        self.order_store.clear()
+        self.disconnect_socketio()
+
+    def apply_order_updates(self, updates):
+        """Apply pushed order deltas to the shared store and notify the visible screen only."""
+        if not self.token:
+            return  # Delivered just before logout; the store has been cleared
+        changed, missing = self.order_store.apply_updates(updates)
+        screen = self.root.current_screen if self.root else None
+        if (changed or missing) and hasattr(screen, "handle_order_update"):
+            screen.handle_order_update(changed, missing)
 
     def build(self):
         """Build the app with screen manager and configurations."""
+        self._startup_timings["import"] = _APP_IMPORTED - _STARTUP_T0
         try:
             width = self.config.getint("Graphics", "width", fallback=460)
             height = self.config.getint("Graphics", "height", fallback=740)
@@ -3517,33 +2864,26 @@ class ServiceApp(App):
         except Exception as e:
             logger.error(f"Failed to set graphics config: {str(e)}")
 
-        sm = ScreenManager()
+        # Screens are only constructed when first navigated to
+        sm = LazyScreenManager()
         screens = [
-            ("login", "LoginScreen"),
-            ("register", "RegistrationScreen"),
-            ("forgot_password", "ForgotPasswordScreen"),
-            ("reset_password", "ResetPasswordScreen"),
-            ("dashboard", "DashboardScreen"),
-            ("admin_dashboard", "AdminDashboard"),
-            ("user_dashboard", "UserDashboard"),
-            ("home", "HomeScreen"),
-            ("cleaning", "CleaningScreen"),
-            ("food", "FoodScreen"),
-            ("groceries", "GroceriesScreen"),
-            ("fruit", "FruitScreen"),
-            ("gardening", "GardeningScreen"),
-            ("cart", "CartScreen"),  # Add CartScreen here
+            ("login", LoginScreen),
+            ("register", RegistrationScreen),
+            ("forgot_password", ForgotPasswordScreen),
+            ("reset_password", ResetPasswordScreen),
+            ("dashboard", DashboardScreen),
+            ("admin_dashboard", AdminDashboard),
+            ("user_dashboard", UserDashboard),
+            ("home", HomeScreen),
+            ("cart", CartScreen),
         ]
+        screens += [(name, CategoryScreen) for name in CATEGORY_SCREENS]
 
         for name, screen_class in screens:
-            try:
-                screen = globals()[screen_class](name=name)
-                sm.add_widget(screen)
-                logger.info(f"Added screen: {name}")
-            except KeyError:
-                logger.warning(f"Screen class '{screen_class}' not defined, skipping")
+            sm.register(name, screen_class)
 
-        sm.current = "login" if "login" in [n for n, _ in screens] else screens[0][0]
+        sm.current = "login"
+        self._startup_timings["build"] = time.perf_counter() - _STARTUP_T0
         return sm
 
     def on_start(self):
@@ -3553,19 +2893,29 @@ class ServiceApp(App):
             if platform == "android" and request_permissions and Permission:
                 request_permissions([Permission.INTERNET, Permission.WRITE_EXTERNAL_STORAGE])
                 logger.info("Requested Android permissions")
-            self.connect_socketio()
+            # on_start runs before anything is drawn; the first flip is the first frame on screen
+            from kivy.core.window import Window
+            Window.bind(on_flip=self._on_first_frame)
         except Exception as e:
             logger.error(f"Error in on_start: {str(e)}", exc_info=True)
             raise
 
+    def _on_first_frame(self, window):
+        """Log startup timings once the first frame has been presented."""
+        window.unbind(on_flip=self._on_first_frame)
+        self._startup_timings["first_frame"] = time.perf_counter() - _STARTUP_T0
+        timings = {k: round(v * 1000, 1) for k, v in self._startup_timings.items()}
+        logger.info(f"Startup timings (ms): {timings}")
+
     def on_stop(self):
         """Handle app shutdown, ensuring resources are released."""
         logger.info("Shutting down ServiceApp")
         self._is_running = False
-        self.sio.disconnect()  # Disconnect Socket.IO
-        self.session.close()  # Close the requests session
+        self.disconnect_socketio()
         logger.info("ServiceApp shutdown complete")
 
+_APP_IMPORTED = time.perf_counter()
+
 # Run the app
 if __name__ == '__main__':
     ServiceApp().run()
\ No newline at end of file